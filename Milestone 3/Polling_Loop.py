@@ -7,7 +7,15 @@ Last modified: 13/10/2023
 
 import time
 import math
+import weakref
+import threading
+import timers
 import sevseg
+import analysis
+import calibration as cal
+import shift_register as shreg
+import sensors as sens
+from instrumentation import timer
 thermIn = 0
 lightIn = 1
 serialPinOutputs = 6
@@ -15,121 +23,144 @@ rclckPinOutputs = 5
 srclckPinOutputs = 4
 alertPin = 3
 sleepTime = 0.5
+hysteresis = 0.5
+lightHysteresis = 50
 risePin = 16
 fallPin = 17
+# The pending turn off of each board's rapid change alert, with the pin it turns off. Forgotten once a board is gone.
+alertReleases = weakref.WeakKeyDictionary()
 
-def get_temp(dataset, board,thermIn=thermIn):
+def get_temp(state, board,thermIn=thermIn):
     """
     Function that gets the voltage from the thermistor through an analog input
     and converts it to temperature data.
 
     Args:
-        dataset (List): List of data needed consisting of temperature, light, change in temperature, and time
-        board: The Arduino
+        state (ControlState): The current temperature, the current light and the sensor history
+        board: The Arduino, or its AnalogSensors
         thermIn (Integer): Analog pin number for the thermistor
 
     Returns:
-        dataset (List): List of data needed consisting of temperature, light, change in temperature, and time
+        state (ControlState): The current temperature, the current light and the sensor history
     """
-    voltOut = (board.analog_read(thermIn)[0])*(5/1023)
-    if voltOut > 0:
-        thermRes = ((voltOut*10)/5)/(1-(voltOut/5))
-        dataset[0] = round(83.966601613537950*math.exp(-0.116185042196742*thermRes))
-        if len(dataset[1]) != 20:
-            dataset[1].append(dataset[0])
-        else:
-            dataset[1].pop(0)
-            dataset[1].append(dataset[0])
-        
-        if len(dataset[1])>=2 and len(dataset[5])>=2:
-            lastTemp1 = dataset[1][-1]
-            lastTemp2 = dataset[1][-2]
-            lastTime1 = dataset[5][-1]
-            lastTime2 = dataset[5][-2]
-            grad = (lastTemp1-lastTemp2)/(lastTime1-lastTime2)
-            if len(dataset[2]) <= 20:
-                dataset[2].append(grad)
-            else:
-                dataset[2].pop(0)
-                dataset[2].append(grad)
-                
-    return dataset
-
-def get_light(dataset, board, lightIn=lightIn):
+    return update_temp(state,board.analog_read(thermIn)[0])
+
+def update_temp(state, raw):
+    """
+    Function that converts a raw thermistor reading to temperature data.
+
+    Args:
+        state (ControlState): The current temperature, the current light and the sensor history
+        raw (Float): The 10-bit analog reading from the thermistor, filtered or not
+
+    Returns:
+        state (ControlState): The current temperature, the current light and the sensor history
+    """
+    temp = cal.raw_to_temp(raw)
+    if not math.isnan(temp):
+        # Kept to a tenth of a degree, since rounding to whole degrees turns noise into 1 C steps
+        state.currentTemp = round(temp,1)
+    return state
+
+def get_light(state, board, lightIn=lightIn):
     """
     Function that gets the voltage from the LDR through an analog input
     and converts it to lux data.
 
     Args:
-        dataset (List): List of data needed consisting of temperature, light, change in temperature, and time
-        board: The Arduino
+        state (ControlState): The current temperature, the current light and the sensor history
+        board: The Arduino, or its AnalogSensors
         lightIn (Integer): Analog pin number for the LDR
 
     Returns:
-        dataset (List): List of data needed consisting of temperature, light, change in temperature, and time
+        state (ControlState): The current temperature, the current light and the sensor history
     """
-    voltOut = (board.analog_read(lightIn)[0])*(5/1023)
-    if voltOut > 0:
-        ldrRes = ((voltOut*10)/5)/(1-(voltOut/5))
-        dataset[3] = 1560.31496068566*math.exp(-0.0006516603208904828*ldrRes)
-        if len(dataset[4]) != 20:
-            dataset[4].append(dataset[3])
-        else:
-            dataset[4].pop(0)
-            dataset[4].append(dataset[0])
-    return dataset
+    return update_light(state,board.analog_read(lightIn)[0])
+
+def update_light(state, raw):
+    """
+    Function that converts a raw LDR reading to lux data.
+
+    Args:
+        state (ControlState): The current temperature, the current light and the sensor history
+        raw (Float): The 10-bit analog reading from the LDR, filtered or not
 
+    Returns:
+        state (ControlState): The current temperature, the current light and the sensor history
+    """
+    lux = cal.raw_to_lux(raw)
+    if not math.isnan(lux):
+        state.currentLight = lux
+    return state
 
-def rapid_changing_temp_check(gradData):
+
+def rapid_changing_temp_check(gradient):
     """
     Function that checks if there's a rapid change in temperature
 
     Args:
-        gradData (List): The data storing the gradient/change in temperature
+        gradient (GradientTracker): The smoothed gradient/change in temperature over the sample window
 
     Returns:
-        Boolean: True if there's a rapid change, False if there's none
+        Boolean: True if a rapid change has started, False if there's none
     """
-    if len(gradData) < 2:
-        return False
-    else:
-        if ((gradData[-1]-3)>gradData[-2]) or ((gradData[-1]+3)<gradData[-2]):
-            return True
-        else:
-            return False
+    return gradient.event is not None
+
+
+def release_alert(board,pin,alertPin=alertPin):
+    """
+    Function that turns the rapid change outputs back off once the alert has been shown for long enough.
+    It runs on the scheduler's thread, so an error is shown instead of stopping the scheduler.
+
+    Args:
+        board: The Arduino
+        pin (Integer): Digital pin number of the rise or fall output that was turned on
+        alertPin (Integer): Digital pin number for if there's a rapid change in temperature.
+    """
+    alertReleases.pop(board,None)
+    try:
+        board.digital_pin_write(pin,0)
+        shreg.digital_write(alertPin,0,board)
+    except Exception as error:
+        print(f"Couldn't turn the rapid change alert off: {error!r}")
 
 
-def rapid_changing_temp(gradData,duration,board,risePin=risePin,fallPin=fallPin,alertPin=alertPin):
+def rapid_changing_temp(gradient,duration,board,display,risePin=risePin,fallPin=fallPin,alertPin=alertPin,verbose=True,scheduler=timers.shared):
     """
-    Function that generates an output when ther's a rapid change in temperature
+    Function that generates an output when ther's a rapid change in temperature.
+    Returns straight away, and the outputs are turned off again on the scheduler after the duration.
 
     Args:
-        gradData (List): The data storing the gradient/change in temperature
+        gradient (GradientTracker): The smoothed gradient/change in temperature over the sample window
         duration (Integer): The time the output is being outputted
         board: The Arduino
+        display (SevsegDisplay): The seven segment display being refreshed in the background
         risePin (Integer): Digital pin number for the output when the temperature rises quickly.
         fallPin (Integer): Digital pin number for the output when the temperature rises quickly.
+        alertPin (Integer): Digital pin number for if there's a rapid change in temperature.
+        verbose (Boolean): Print the change in temperature
+        scheduler (Scheduler): Where the outputs are turned off from. Defaults to timers.shared.
+
+    Returns:
+        Boolean: True if an alert was started, False if there was none
     """
-    if len(gradData) < 2:
+    event = gradient.pop_event()
+    if event is None:
         return False
-    else:        
-        try:
-            board.digital_pin_write(alertPin,1)
-            if ((gradData[-1]-3)>gradData[-2]):
-                board.digital_pin_write(risePin,1)
-                print(f"Change in temperature too high, with change of {gradData[-1]}")
-                sevseg.write_sevseg("Rapid rise",1,board)
-                time.sleep(duration)
-                board.digital_pin_write(risePin,0)
-            elif ((gradData[-1]+3)<gradData[-2]):
-                board.digital_pin_write(fallPin,1)
-                print(f"Change in temperature too high, with change of {gradData[-1]}")
-                sevseg.write_sevseg("Rapid fall",1,board)
-                time.sleep(duration)
-                board.digital_pin_write(fallPin,0)
-            board.digital_pin_write(alertPin,0)
-        except KeyboardInterrupt:
-            pass
+    pin = risePin if event == 'rise' else fallPin
+    # A newer alert restarts the countdown instead of being cut short by the older one
+    previous = alertReleases.pop(board,None)
+    if previous is not None:
+        scheduler.cancel(previous[0])
+        if previous[1] != pin:
+            board.digital_pin_write(previous[1],0)
+    shreg.digital_write(alertPin,1,board)
+    board.digital_pin_write(pin,1)
+    if verbose:
+        print(f"Change in temperature too high, with change of {round(gradient.smoothed,2)} C/s")
+    display.set_message(f"Rapid {event}")
+    alertReleases[board] = (scheduler.call_later(duration,release_alert,board,pin,alertPin),pin)
+    return True
 
 def light_check(currentLight,fanSpeed):
     """
@@ -153,7 +184,7 @@ def thermometer_check(currentTemp,maxTemp,minTemp):
     Function that checks the temperature and gives an output of the appropriate thermometer output
 
     Args:
-        currentTemp (Integer): The current temperature being received by the thermistor
+        currentTemp (Float): The current temperature being received by the thermistor
         maxTemp (Integer): The upper bound of the temperature's limit set
         minTemp (Integer): The lower bound of the temperature's limit set
 
@@ -184,303 +215,216 @@ def thermometer_check(currentTemp,maxTemp,minTemp):
             return types[4]
 
 
-def outputs(currentTemp,gradData,currentLight,settings,board,serialPin=serialPinOutputs,rclckPin=rclckPinOutputs,srclckPin=srclckPinOutputs,alertPin=alertPin):
+# Which band each thermometer_check severity belongs to
+severityBands = {
+    'tooCold': 'heat', 'cold': 'heat', 'notVeryCold': 'heat',
+    'neutral1': 'neutral', 'neutral2': 'neutral', 'neutral3': 'neutral',
+    'notVeryHot': 'cool', 'Hot': 'cool', 'tooHot': 'cool'}
+
+# (band, vent speed, severity) to the LED pattern name in shift_register.ledDict
+outputTable = {
+    ('heat',1,'tooCold'): 'heat1TooCold',
+    ('heat',1,'cold'): 'heat1Cold',
+    ('heat',1,'notVeryCold'): 'heat1NotVeryCold',
+    ('heat',2,'tooCold'): 'heat2TooCold',
+    ('heat',2,'cold'): 'heat2Cold',
+    ('heat',2,'notVeryCold'): 'heat2NotVeryCold',
+    ('cool',1,'tooHot'): 'cold1TooHot',
+    ('cool',1,'Hot'): 'cold1Hot',
+    ('cool',1,'notVeryHot'): 'cold1NotVeryHot',
+    ('cool',2,'tooHot'): 'cold2TooHot',
+    ('cool',2,'Hot'): 'cold2Hot',
+    ('cool',2,'notVeryHot'): 'cold2NotVeryHot',
+    ('neutral',1,'neutral3'): 'neutral3',
+    ('neutral',1,'neutral2'): 'neutral2',
+    ('neutral',1,'neutral1'): 'neutral1',
+    ('neutral',2,'neutral3'): 'neutral3',
+    ('neutral',2,'neutral2'): 'neutral2',
+    ('neutral',2,'neutral1'): 'neutral1'}
+
+bandReports = {
+    'heat': "Temperature too cold ({temp}), heating up with vent speed {speed}",
+    'cool': "Temperature too hot ({temp}), cooling down with vent speed {speed}",
+    'neutral': "Temperature is within the goal range ({temp})"}
+
+# Compiled once, so each cycle is a single lookup to get the LED bitmask and report
+outputFrames = {key: (shreg.ledPatterns[ledKey],bandReports[key[0]]) for key, ledKey in outputTable.items()}
+
+
+def output_state(currentTemp,currentLight,settings,previous=None,hysteresis=hysteresis,lightHysteresis=lightHysteresis):
+    """
+    Function that decides which output state the system should be in for the current conditions.
+    The severity only changes once the temperature is more than hysteresis past a boundary, and the
+    vent speed only once the light is more than lightHysteresis past its threshold, so a reading
+    sitting on a boundary doesn't make the outputs flicker.
+
+    Args:
+        currentTemp (Float): The current temperature being received by the thermistor
+        currentLight (Integer): The current lux being received by the LDR
+        settings (Settings): The settings set by the user. This consists of the upper and lower bound of the temperature and fan speed
+        previous (Tuple): The state returned last time, if there is one
+        hysteresis (Float): How far past a boundary the temperature has to go in degrees C
+        lightHysteresis (Float): How far past the threshold the light has to go in lux
+
+    Returns:
+        key (Tuple): (band, vent speed, severity), a key of outputFrames
+    """
+    ventSpeed = light_check(currentLight,settings.ventSpeed)
+    if previous is not None and ventSpeed != previous[1]:
+        nearby = (light_check(currentLight-lightHysteresis,settings.ventSpeed),
+                  light_check(currentLight+lightHysteresis,settings.ventSpeed))
+        if previous[1] in nearby:
+            ventSpeed = previous[1]
+    severity = thermometer_check(currentTemp,settings.tempHigh,settings.tempLow)
+    if previous is not None and severity != previous[2]:
+        nearby = (thermometer_check(currentTemp-hysteresis,settings.tempHigh,settings.tempLow),
+                  thermometer_check(currentTemp+hysteresis,settings.tempHigh,settings.tempLow))
+        if previous[2] in nearby:
+            severity = previous[2]
+    return (severityBands[severity],ventSpeed,severity)
+
+
+def outputs(currentTemp,gradient,currentLight,settings,board,display,previous=None,serialPin=serialPinOutputs,rclckPin=rclckPinOutputs,srclckPin=srclckPinOutputs,risePin=risePin,fallPin=fallPin,alertPin=alertPin,verbose=True,timer=timer):
     """
-    The main outputs function, which outputs depending on the conditions given
+    The main outputs function, which outputs depending on the conditions given.
+    The LEDs are only written when the output state changes.
 
     Args:
-        currentTemp (Integer): The current temperature being received by the thermistor
-        gradData (List): The data storing the gradient/change in temperature
+        currentTemp (Float): The current temperature being received by the thermistor
+        gradient (GradientTracker): The smoothed gradient/change in temperature over the sample window
         currentLight (Integer): The current lux being received by the LDR
-        settings (List): List of the settings set by the user. This consists of the upper and lower bound of the temperature and fan speed
+        settings (Settings): The settings set by the user. This consists of the upper and lower bound of the temperature and fan speed
         board: The Arduino
+        display (SevsegDisplay): The seven segment display being refreshed in the background
+        previous (Tuple): The output state from the last cycle, if there is one
         serialPin (Integer): Digital pin number for the shift register's serial pin.
         rclckPin (Integer): Digital pin number for the shift register's register clock pin.
         srclckPin (Integer): Digital pin number for the shift register's serial clock pin.
+        risePin (Integer): Digital pin number for the output when the temperature rises quickly.
+        fallPin (Integer): Digital pin number for the output when the temperature falls quickly.
         alertPin (Integer): Digital pin number for if there's a rapid change in temperature.
+        verbose (Boolean): Print what the system is doing
+        timer (StageTimer): Where the time each stage takes is recorded
+
+    Returns:
+        key (Tuple): The output state now showing
     """
-    ledDict = {
-        # Using 2 shift registers
-        # For normal outputs 3 Red 3 Green 3 Blue convention
-        'cold1TooHot': '0111100000000001',
-        'cold1Hot': '0101100000000001',
-        'cold1NotVeryHot': '0100100000000001',
-        'cold2TooHot': '1111100000000011',
-        'cold2Hot': '1101100000000011',
-        'cold2NotVeryHot': '1100100000000011',
-        'heat1TooCold': '0100000011101000',
-        'heat1Cold': '0100000001101000',
-        'heat1NotVeryCold': '01000000001001000',
-        'heat2TooCold': '1100000011111000',
-        'heat2Cold': '1100000001111000',
-        'heat2NotVeryCold': '1100000000111000',        
-        'neutral3': '0000011100000000',
-        'neutral2': '0000001100000000',
-        'neutral1': '0000000100000000',
-        'change': '0000000000010000',
-        'reset': '0000000000000000'
-    }
-    lowBound = settings[0]
-    upBound = settings[1]
-    ventSpeed = settings[2]
-    
-    for serial in ledDict['reset']:
-        board.digital_pin_write(serialPin,int(serial))
-        board.digital_pin_write(srclckPin,1)
-        time.sleep(0.0001)
-        board.digital_pin_write(srclckPin,0)
-    board.digital_pin_write(rclckPin,1)
-    time.sleep(0.0001)
-    board.digital_pin_write(rclckPin,0)
-    board.digital_pin_write(alertPin,0)
-    sevseg.write_sevseg('    ',0.001,board)
-
-    if rapid_changing_temp_check(gradData):
-        rapid_changing_temp(gradData,1,board)
-        for serial in ledDict['change']:
-            board.digital_pin_write(serialPin,int(serial))
-            board.digital_pin_write(srclckPin,1)
-            time.sleep(0.0001)
-            board.digital_pin_write(srclckPin,0)
-        board.digital_pin_write(rclckPin,1)
-        time.sleep(0.0001)
-        board.digital_pin_write(rclckPin,0)
-        
-        
-    ventSpeed = light_check(currentLight,ventSpeed)
-    thermometer_val = thermometer_check(currentTemp,upBound,lowBound)
-        
-    if currentTemp < lowBound:
-        if ventSpeed == 2:
-            if thermometer_val == 'tooCold':
-                for serial in ledDict['heat2TooCold']:
-                    board.digital_pin_write(serialPin,int(serial))
-                    board.digital_pin_write(srclckPin,1)
-                    time.sleep(0.0001)
-                    board.digital_pin_write(srclckPin,0)
-                board.digital_pin_write(rclckPin,1)
-                time.sleep(0.0001)
-                board.digital_pin_write(rclckPin,0)
-                print(f"Temperature too cold ({currentTemp}), heating up with vent speed {ventSpeed}")
-                msg = str(currentTemp)+'*c'
-                sevseg.write_sevseg(msg,2.5,board)
-            elif thermometer_val == 'cold':
-                for serial in ledDict['heat2Cold']:
-                    board.digital_pin_write(serialPin,int(serial))
-                    board.digital_pin_write(srclckPin,1)
-                    time.sleep(0.0001)
-                    board.digital_pin_write(srclckPin,0)
-                board.digital_pin_write(rclckPin,1)
-                time.sleep(0.0001)
-                board.digital_pin_write(rclckPin,0)
-                print(f"Temperature too cold ({currentTemp}), heating up with vent speed {ventSpeed}")
-                msg = str(currentTemp)+'*c'
-                sevseg.write_sevseg(msg,2.5,board)
-            else:
-                for serial in ledDict['heat2NotVeryCold']:
-                    board.digital_pin_write(serialPin,int(serial))
-                    board.digital_pin_write(srclckPin,1)
-                    time.sleep(0.0001)
-                    board.digital_pin_write(srclckPin,0)
-                board.digital_pin_write(rclckPin,1)
-                time.sleep(0.0001)
-                board.digital_pin_write(rclckPin,0)
-                print(f"Temperature too cold ({currentTemp}), heating up with vent speed {ventSpeed}")
-                msg = str(currentTemp)+'*c'
-                sevseg.write_sevseg(msg,2.5,board)
-        else:
-            if thermometer_val == 'tooCold':
-                for serial in ledDict['heat1TooColc']:
-                    board.digital_pin_write(serialPin,int(serial))
-                    board.digital_pin_write(srclckPin,1)
-                    time.sleep(0.0001)
-                    board.digital_pin_write(srclckPin,0)
-                board.digital_pin_write(rclckPin,1)
-                time.sleep(0.0001)
-                board.digital_pin_write(rclckPin,0)
-                print(f"Temperature too cold ({currentTemp}), heating up with vent speed {ventSpeed}")
-                msg = str(currentTemp)+'*c'
-                sevseg.write_sevseg(msg,2.5,board)
-            elif thermometer_val == 'cold':
-                for serial in ledDict['heat1Cold']:
-                    board.digital_pin_write(serialPin,int(serial))
-                    board.digital_pin_write(srclckPin,1)
-                    time.sleep(0.0001)
-                    board.digital_pin_write(srclckPin,0)
-                board.digital_pin_write(rclckPin,1)
-                time.sleep(0.0001)
-                board.digital_pin_write(rclckPin,0)
-                print(f"Temperature too cold ({currentTemp}), heating up with vent speed {ventSpeed}")
-                msg = str(currentTemp)+'*c'
-                sevseg.write_sevseg(msg,2.5,board)
-            else:
-                for serial in ledDict['heat1NotVeryCold']:
-                    board.digital_pin_write(serialPin,int(serial))
-                    board.digital_pin_write(srclckPin,1)
-                    time.sleep(0.0001)
-                    board.digital_pin_write(srclckPin,0)
-                board.digital_pin_write(rclckPin,1)
-                time.sleep(0.0001)
-                board.digital_pin_write(rclckPin,0)
-                print(f"Temperature too cold ({currentTemp}), heating up with vent speed {ventSpeed}")
-                msg = str(currentTemp)+'*c'
-                sevseg.write_sevseg(msg,2.5,board)
-    
-    elif currentTemp > upBound:
-        if ventSpeed == 2:
-            if thermometer_val == 'tooHot':
-                for serial in ledDict['cold2TooHot']:
-                    board.digital_pin_write(serialPin,int(serial))
-                    board.digital_pin_write(srclckPin,1)
-                    time.sleep(0.0001)
-                    board.digital_pin_write(srclckPin,0)
-                board.digital_pin_write(rclckPin,1)
-                time.sleep(0.0001)
-                board.digital_pin_write(rclckPin,0)
-                print(f"Temperature too hot ({currentTemp}), cooling down with vent speed {ventSpeed}")
-                msg = str(currentTemp)+'*c'
-                sevseg.write_sevseg(msg,2.5,board)
-            elif thermometer_val == 'hot':
-                for serial in ledDict['cold2Cold']:
-                    board.digital_pin_write(serialPin,int(serial))
-                    board.digital_pin_write(srclckPin,1)
-                    time.sleep(0.0001)
-                    board.digital_pin_write(srclckPin,0)
-                board.digital_pin_write(rclckPin,1)
-                time.sleep(0.0001)
-                board.digital_pin_write(rclckPin,0)
-                print(f"Temperature too hot ({currentTemp}), cooling down with vent speed {ventSpeed}")
-                msg = str(currentTemp)+'*c'
-                sevseg.write_sevseg(msg,2.5,board)
-            else:
-                for serial in ledDict['cold2NotVeryHot']:
-                    board.digital_pin_write(serialPin,int(serial))
-                    board.digital_pin_write(srclckPin,1)
-                    time.sleep(0.0001)
-                    board.digital_pin_write(srclckPin,0)
-                board.digital_pin_write(rclckPin,1)
-                time.sleep(0.0001)
-                board.digital_pin_write(rclckPin,0)
-                print(f"Temperature too hot ({currentTemp}), cooling down with vent speed {ventSpeed}")
-                msg = str(currentTemp)+'*c'
-                sevseg.write_sevseg(msg,2.5,board)
-        else:
-            if thermometer_val == 'tooHot':
-                for serial in ledDict['cold1TooHot']:
-                    board.digital_pin_write(serialPin,int(serial))
-                    board.digital_pin_write(srclckPin,1)
-                    time.sleep(0.0001)
-                    board.digital_pin_write(srclckPin,0)
-                board.digital_pin_write(rclckPin,1)
-                time.sleep(0.0001)
-                board.digital_pin_write(rclckPin,0)
-                print(f"Temperature too hot ({currentTemp}), cooling down up with vent speed {ventSpeed}")
-                msg = str(currentTemp)+'*c'
-                sevseg.write_sevseg(msg,2.5,board)
-            elif thermometer_val == 'hot':
-                for serial in ledDict['cold1hot']:
-                    board.digital_pin_write(serialPin,int(serial))
-                    board.digital_pin_write(srclckPin,1)
-                    time.sleep(0.0001)
-                    board.digital_pin_write(srclckPin,0)
-                board.digital_pin_write(rclckPin,1)
-                time.sleep(0.0001)
-                board.digital_pin_write(rclckPin,0)
-                print(f"Temperature too hot ({currentTemp}), cooling down up with vent speed {ventSpeed}")
-                msg = str(currentTemp)+'*c'
-                sevseg.write_sevseg(msg,2.5,board)
-            else:
-                for serial in ledDict['cold1NotVeryHot']:
-                    board.digital_pin_write(serialPin,int(serial))
-                    board.digital_pin_write(srclckPin,1)
-                    time.sleep(0.0001)
-                    board.digital_pin_write(srclckPin,0)
-                board.digital_pin_write(rclckPin,1)
-                time.sleep(0.0001)
-                board.digital_pin_write(rclckPin,0)
-                print(f"Temperature too hot ({currentTemp}), cooling down up with vent speed {ventSpeed}")
-                msg = str(currentTemp)+'*c'
-                sevseg.write_sevseg(msg,2.5,board)
-    
-    else:
-        if thermometer_val == 'neutral3':
-            for serial in ledDict['neutral3']:
-                board.digital_pin_write(serialPin,int(serial))
-                board.digital_pin_write(srclckPin,1)
-                time.sleep(0.0001)
-                board.digital_pin_write(srclckPin,0)
-            board.digital_pin_write(rclckPin,1)
-            time.sleep(0.0001)
-            board.digital_pin_write(rclckPin,0)
-            print(f"Temperature is within the goal range ({currentTemp})")
-            msg = str(currentTemp)+'*c'
-            sevseg.write_sevseg(msg,2.5,board)
-        elif thermometer_val == 'neutral2':
-            for serial in ledDict['neutral2']:
-                board.digital_pin_write(serialPin,int(serial))
-                board.digital_pin_write(srclckPin,1)
-                time.sleep(0.0001)
-                board.digital_pin_write(srclckPin,0)
-            board.digital_pin_write(rclckPin,1)
-            time.sleep(0.0001)
-            board.digital_pin_write(rclckPin,0)
-            print(f"Temperature is within the goal range ({currentTemp})")
-            msg = str(currentTemp)+'*c'
-            sevseg.write_sevseg(msg,2.5,board)
-        else:
-            for serial in ledDict['neutral1']:
-                board.digital_pin_write(serialPin,int(serial))
-                board.digital_pin_write(srclckPin,1)
-                time.sleep(0.0001)
-                board.digital_pin_write(srclckPin,0)
-            board.digital_pin_write(rclckPin,1)
-            time.sleep(0.0001)
-            board.digital_pin_write(rclckPin,0)
-            print(f"Temperature is within the goal range ({currentTemp})")
-            msg = str(currentTemp)+'*c'
-            sevseg.write_sevseg(msg,2.5,board)
-
-
-def polling_loop(dataset,settings,board,serialPin=serialPinOutputs,rclckPin=rclckPinOutputs,srclckPin=srclckPinOutputs):
+    alerted = False
+    if rapid_changing_temp_check(gradient):
+        with timer.stage('rapid alert'):
+            rapid_changing_temp(gradient,1,board,display,risePin,fallPin,alertPin,verbose)
+        with timer.stage('shift register'):
+            shreg.shift_out('change',board,serialPin,rclckPin,srclckPin)
+        alerted = True
+
+    with timer.stage('decision'):
+        key = output_state(currentTemp,currentLight,settings,previous)
+        pattern, report = outputFrames[key]
+    if key != previous or alerted:
+        with timer.stage('shift register'):
+            shreg.shift_out(pattern,board,serialPin,rclckPin,srclckPin)
+    if verbose:
+        print(report.format(temp=currentTemp,speed=key[1]))
+    display.set_message(str(round(currentTemp))+'*c')
+    return key
+
+
+def polling_loop(state,settings,board,serialPin=serialPinOutputs,rclckPin=rclckPinOutputs,srclckPin=srclckPinOutputs,risePin=risePin,fallPin=fallPin,alertPin=alertPin,thermIn=thermIn,lightIn=lightIn,display=None,stop=None,settingsChannel=None,verbose=True,rate=None,timer=timer):
     """
     The main polling loop function for the system.
 
     Args:
-        dataset (List): List of data needed consisting of temperature, light, change in temperature, and time
-        settings (List): List of the settings set by the user. This consists of the upper and lower bound of the temperature and fan speed
+        state (ControlState): The current temperature, the current light and the sensor history
+        settings (Settings): The settings set by the user. This consists of the upper and lower bound of the temperature and fan speed
         board: The Arduino
         serialPin (Integer): Digital pin number for the shift register's serial pin.
         rclckPin (Integer): Digital pin number for the shift register's register clock pin.
         srclckPin (Integer): Digital pin number for the shift register's serial clock pin.  
+        risePin (Integer): Digital pin number for the output when the temperature rises quickly.
+        fallPin (Integer): Digital pin number for the output when the temperature falls quickly.
+        alertPin (Integer): Digital pin number for if there's a rapid change in temperature.
+        thermIn (Integer): Analog pin number for the thermistor
+        lightIn (Integer): Analog pin number for the LDR
+        display (SevsegDisplay): The seven segment display. Defaults to one on the usual pins.
+        stop (threading.Event): Stops the loop when set, for loops not run from the main thread. Ctrl + C always stops it.
+        settingsChannel (SettingsChannel): Where to pick up new settings from each cycle, for loops running in the background
+        verbose (Boolean): Print what the system is doing every cycle
+        rate (SampleRate): Picks the time between cycles from how much the temperature is moving. Defaults to one between analysis.minInterval and analysis.maxInterval.
+        timer (StageTimer): Where the time each stage takes is recorded, e.g. one for each zone
     
     Returns:
-        dataset (List): List of data needed consisting of temperature, light, change in temperature, and time
+        state (ControlState): The current temperature, the current light and the sensor history
         """
-    timeData = dataset[5]
-    while True:
-        try:
+    history = state.history
+    # The display keeps itself refreshed, so the loop only has to run as fast as the sensors
+    if display is None:
+        display = sevseg.SevsegDisplay(board,timer=timer)
+    display.start()
+    # Readings arrive through callbacks, so the loop only wakes up when one has changed
+    sensors = sens.attach(board,[thermIn,lightIn])
+    sequence = sensors.sequence
+    if stop is None:
+        stop = threading.Event()
+    if rate is None:
+        rate = analysis.SampleRate()
+    reportInterval = None
+    lastSample = 0.0
+    try:
+        # The first reports take a moment to arrive, and a reading of 0 would look like a sudden change
+        if sequence == 0:
+            sequence = sensors.wait_for_change(sequence,sens.idleTime)
+        while not stop.is_set():
             start = time.time()
-            dataset = get_temp(dataset,board)
-            dataset = get_light(dataset,board)
-            outputs(dataset[0],dataset[2],dataset[3],settings,board)
-            stop = time.time()
-            if len(timeData)<20:
-                timeData.append(timeData[-1] + (stop-start))
-            else:
-                timeData.pop(0)
-                timeData.append(timeData[-1] + (stop-start))
-            print(f"Light intensity: {round(dataset[3],2)} lux")
-            print(f"Time taken: {round(time.time()-start,2)} s")
-            print("Ctrl + C to stop")
-            time.sleep(0.005)
-        except KeyboardInterrupt:
-            for i in range(16):
-                board.digital_pin_write(serialPin,0)
-                board.digital_pin_write(srclckPin,1)
-                time.sleep(0.0001)
-                board.digital_pin_write(srclckPin,0)
-            board.digital_pin_write(rclckPin,1)
-            time.sleep(0.0001)
-            board.digital_pin_write(rclckPin,0)
-            sevseg.write_sevseg('    ',0.01,board)
-            return dataset
\ No newline at end of file
+            cycleStart = time.perf_counter()
+            if settingsChannel is not None:
+                settings = settingsChannel.get()
+            with timer.stage('analog reads'):
+                rawTemp = sensors.analog_read(thermIn)[0]
+                rawLight = sensors.analog_read(lightIn)[0]
+                # The history gets the filtered readings, the log keeps the raw ones
+                filteredTemp, sampleTime = sensors.filtered_read(thermIn)
+                state = update_temp(state,filteredTemp)
+                state = update_light(state,sensors.filtered_read(lightIn)[0])
+            # Stamped with when the board took the reading, so the gradient is fitted against it.
+            # A cycle that timed out waiting has no new reading to store.
+            newSample = sampleTime > lastSample
+            lastSample = max(sampleTime,lastSample)
+            with timer.stage('gradient'):
+                if newSample:
+                    history.append(sampleTime,state.currentTemp,state.currentLight)
+                interval = rate.update(state.currentTemp,history.gradient)
+            # The board only has to report as often as the loop needs a filtered reading, but
+            # not so slowly that the filtered readings fall behind when the room starts changing
+            if interval != reportInterval:
+                sens.set_sampling_interval(board,min(interval/sensors.oversampling,sens.maxReportInterval))
+                reportInterval = interval
+            if state.log is not None and newSample:
+                with timer.stage('log'):
+                    state.log.append(sampleTime,rawTemp,rawLight,state.currentTemp,state.currentLight)
+            state.outputKey = outputs(state.currentTemp,history.gradient,state.currentLight,settings,board,display,state.outputKey,serialPin,rclckPin,srclckPin,risePin,fallPin,alertPin,verbose,timer)
+            if verbose:
+                print(f"Light intensity: {round(state.currentLight,2)} lux")
+                print(f"Time taken: {round(time.time()-start,2)} s")
+                print(f"Next reading in: {round(interval,2)} s")
+                print("Ctrl + C to stop")
+            with timer.stage('sleep'):
+                if stop.wait(interval):
+                    break
+                # Waits for a new reading in short slices, so a stop is noticed straight away
+                idleUntil = time.monotonic() + sens.idleTime
+                newSequence = sequence
+                while newSequence == sequence and not stop.is_set() and time.monotonic() < idleUntil:
+                    newSequence = sensors.wait_for_change(sequence,sleepTime)
+                sequence = newSequence
+            timer.record('cycle',time.perf_counter()-cycleStart)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        # However the loop stops, even on an error, the outputs are turned off and the log is saved
+        display.stop()
+        shreg.shift_out('reset',board,serialPin,rclckPin,srclckPin)
+        sens.set_sampling_interval(board)
+        state.outputKey = None
+        if state.log is not None:
+            state.log.flush()
+    return state
@@ -0,0 +1,254 @@
+"""
+Temperature Analysis function file
+Created by: Team D09
+Version: 1
+Last modified: 18/10/2026
+"""
+
+import math
+from collections import deque
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+slopeWindow = 20
+chunkSize = 65536
+smoothing = 0.3
+rapidThreshold = 0.5
+minInterval = 0.1
+maxInterval = 5.0
+steadyNoise = 0.5
+backoff = 1.5
+
+
+class GradientTracker:
+    """
+    Class that keeps a least-squares slope of the temperature over the last few samples.
+    The sums behind the fit are updated as samples come in and go out of the window,
+    so each new sample costs the same however big the window is.
+
+    Args:
+        window (Integer): How many samples the slope is fitted over
+        smoothing (Float): Weight of the newest slope in the smoothed derivative, between 0 and 1
+        threshold (Float): Smoothed slope in degrees C per second that counts as a rapid change
+    """
+    def __init__(self,window=slopeWindow,smoothing=smoothing,threshold=rapidThreshold):
+        self.window = window
+        self.smoothing = smoothing
+        self.threshold = threshold
+        self.samples = deque(maxlen=window)
+        self.slope = 0.0
+        self.smoothed = 0.0
+        self.trend = None
+        self.event = None
+        self._added = 0
+        self._rebase(0.0)
+
+    def _rebase(self,origin):
+        # Times are kept relative to an origin close to the window, recomputing the sums
+        # every window length so they never lose precision as time grows
+        self.origin = origin
+        self.sumX = self.sumY = self.sumXX = self.sumXY = 0.0
+        for timeStamp, temp in self.samples:
+            self._include(timeStamp,temp,1)
+
+    def _include(self,timeStamp,temp,sign):
+        x = timeStamp - self.origin
+        self.sumX += sign*x
+        self.sumY += sign*temp
+        self.sumXX += sign*x*x
+        self.sumXY += sign*x*temp
+
+    def add(self,timeStamp,temp):
+        """
+        Function that adds a sample and updates the slope, the smoothed derivative and the trend.
+
+        Args:
+            timeStamp (Float): When the sample was taken in seconds
+            temp (Float): Temperature in degrees C
+
+        Returns:
+            smoothed (Float): The smoothed derivative in degrees C per second
+        """
+        if self._added % self.window == 0:
+            self._rebase(timeStamp)
+        self._added += 1
+        if len(self.samples) == self.window:
+            self._include(*self.samples[0],-1)
+        self.samples.append((timeStamp,temp))
+        self._include(timeStamp,temp,1)
+
+        n = len(self.samples)
+        denominator = n*self.sumXX - self.sumX*self.sumX
+        if n >= 2 and denominator > 0:
+            self.slope = (n*self.sumXY - self.sumX*self.sumY)/denominator
+        self.smoothed += self.smoothing*(self.slope-self.smoothed)
+
+        # Half the threshold to leave a trend, so it doesn't flicker around the threshold
+        if self.smoothed > self.threshold:
+            trend = 'rise'
+        elif self.smoothed < -self.threshold:
+            trend = 'fall'
+        elif abs(self.smoothed) < self.threshold/2:
+            trend = None
+        else:
+            trend = self.trend
+        if trend != self.trend and trend is not None:
+            self.event = trend
+        self.trend = trend
+        return self.smoothed
+
+    def pop_event(self):
+        """
+        Function that gives the rapid change that has started since the last call, if any.
+
+        Returns:
+            event (String): 'rise', 'fall' or None
+        """
+        event = self.event
+        self.event = None
+        return event
+
+
+class SampleRate:
+    """
+    Class that picks how long to wait between samples from how much the temperature is moving.
+    It drops straight to the shortest interval as soon as the temperature starts changing and
+    backs off a little each sample while the room stays steady, so a change is never missed
+    but an idle board isn't kept busy.
+
+    Args:
+        minInterval (Float): Shortest time between samples in seconds, used while the temperature is changing
+        maxInterval (Float): Longest time between samples in seconds, reached once the room has been steady a while
+        noise (Float): Standard deviation of the temperature in degrees C that still counts as steady
+        smoothing (Float): Weight of the newest sample in the running mean and variance, between 0 and 1
+        backoff (Float): How much longer the interval gets each steady sample
+    """
+    def __init__(self,minInterval=minInterval,maxInterval=maxInterval,noise=steadyNoise,smoothing=smoothing,backoff=backoff):
+        self.minInterval = minInterval
+        self.maxInterval = maxInterval
+        self.noise = noise
+        self.smoothing = smoothing
+        self.backoff = backoff
+        self.interval = minInterval
+        self.mean = None
+        self.variance = 0.0
+
+    def update(self,temp,gradient):
+        """
+        Function that adds a sample and works out how long to wait before the next one.
+
+        Args:
+            temp (Float): Temperature in degrees C
+            gradient (GradientTracker): The slope of the temperature, already updated with the sample
+
+        Returns:
+            interval (Float): Seconds to wait before the next sample
+        """
+        if self.mean is None:
+            self.mean = temp
+        # Running mean and variance, so each sample costs the same however long the loop runs
+        delta = temp - self.mean
+        self.mean += self.smoothing*delta
+        self.variance = (1-self.smoothing)*(self.variance + self.smoothing*delta*delta)
+
+        # How busy the room is, where 1 is a rapid change or readings jumping about
+        activity = max(abs(gradient.smoothed)/gradient.threshold,math.sqrt(self.variance)/self.noise)
+        if activity >= 1 or gradient.trend is not None:
+            self.interval = self.minInterval
+        elif activity < 0.5:
+            self.interval = min(self.interval*self.backoff,self.maxInterval)
+        # In between, the interval is held so it doesn't flicker
+        return self.interval
+
+
+def window_slope(times,temps):
+    """
+    Function that fits a least-squares slope to a whole window of samples at once.
+
+    Args:
+        times (Array): When each sample was taken in seconds
+        temps (Array): Temperature of each sample in degrees C
+
+    Returns:
+        slope (Float): The slope in degrees C per second, 0 if there isn't enough data
+    """
+    if len(times) < 2:
+        return 0.0
+    x = times - times[0]
+    x = x - x.mean()
+    denominator = np.dot(x,x)
+    if denominator == 0:
+        return 0.0
+    return float(np.dot(x,temps-temps.mean())/denominator)
+
+
+def rolling_slopes(times,temps,window=slopeWindow,chunkSize=chunkSize):
+    """
+    Function that works out the least-squares slope ending at every sample of a history.
+    Each window is measured from its own mean, like window_slope, so the slopes stay accurate
+    however many weeks the history covers. Windows are done a chunk at a time in array operations.
+
+    Args:
+        times (Array): When each sample was taken in seconds
+        temps (Array): Temperature of each sample in degrees C
+        window (Integer): How many samples each slope is fitted over
+        chunkSize (Integer): How many windows are worked out at once, which limits the memory used
+
+    Returns:
+        slopes (numpy.ndarray): The slope at each sample in degrees C per second
+    """
+    x = np.asarray(times,dtype=float)
+    y = np.asarray(temps,dtype=float)
+    slopes = np.zeros(len(x))
+    # The first few samples don't have a whole window behind them yet
+    for end in range(2,min(window,len(x)+1)):
+        slopes[end-1] = window_slope(x[:end],y[:end])
+    if len(x) < window:
+        return slopes
+
+    xWindows = sliding_window_view(x,window)
+    yWindows = sliding_window_view(y,window)
+    for start in range(0,len(xWindows),chunkSize):
+        dx = xWindows[start:start+chunkSize]
+        dx = dx - dx.mean(axis=1,keepdims=True)
+        dy = yWindows[start:start+chunkSize]
+        dy = dy - dy.mean(axis=1,keepdims=True)
+        denominator = np.einsum('ij,ij->i',dx,dx)
+        numerator = np.einsum('ij,ij->i',dx,dy)
+        valid = denominator > 0
+        chunk = slopes[window-1+start:window-1+start+len(dx)]
+        chunk[valid] = numerator[valid]/denominator[valid]
+    return slopes
+
+
+def smoothed_slopes(times,temps,window=slopeWindow,smoothing=smoothing):
+    """
+    Function that works out the smoothed derivative at every sample of a history, the same thing
+    GradientTracker gives as samples come in, so logged and live gradients mean the same.
+    The moving average is worked out a block at a time in array operations.
+
+    Args:
+        times (Array): When each sample was taken in seconds
+        temps (Array): Temperature of each sample in degrees C
+        window (Integer): How many samples each slope is fitted over
+        smoothing (Float): Weight of the newest slope in the smoothed derivative, between 0 and 1
+
+    Returns:
+        smoothed (numpy.ndarray): The smoothed derivative at each sample in degrees C per second
+    """
+    slopes = rolling_slopes(times,temps,window)
+    if smoothing >= 1:
+        return slopes
+    if smoothing <= 0:
+        return np.zeros(len(slopes))
+    decay = 1-smoothing
+    # Each smoothed value is decay**k*(previous + smoothing*sum(slope*decay**-j)), with the
+    # blocks kept short enough that decay**-j never overflows
+    block = max(1,min(4096,int(500/-math.log(decay))))
+    smoothed = np.empty(len(slopes))
+    previous = 0.0
+    for start in range(0,len(slopes),block):
+        values = slopes[start:start+block]
+        powers = decay**np.arange(1,len(values)+1)
+        smoothed[start:start+len(values)] = powers*(previous + smoothing*np.cumsum(values/powers))
+        previous = smoothed[start+len(values)-1]
+    return smoothed
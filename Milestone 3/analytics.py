@@ -0,0 +1,167 @@
+"""
+History Analytics function file
+Created by: Team D09
+Version: 1
+Last modified: 18/10/2026
+"""
+
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+import analysis
+statsWindow = 120
+anomalyScore = 3
+columns = ('time','temp','light')
+# Workers start fresh rather than as a copy of a process already running the board's threads.
+# Spawn works the same on Windows, macOS and Linux.
+startMethod = 'spawn'
+
+
+def rolling_stats(values,window=statsWindow):
+    """
+    Function that works out the mean and standard deviation of the last few samples at every sample,
+    using cumulative sums so the whole history is done in a few array operations.
+
+    Args:
+        values (Array): The samples
+        window (Integer): How many samples each mean and standard deviation is over
+
+    Returns:
+        mean (numpy.ndarray): The rolling mean at each sample
+        std (numpy.ndarray): The rolling standard deviation at each sample
+    """
+    values = np.asarray(values,dtype=float)
+    total = np.concatenate(([0.0],np.cumsum(values)))
+    squares = np.concatenate(([0.0],np.cumsum(values*values)))
+    end = np.arange(1,len(values)+1)
+    start = np.maximum(end-window,0)
+    n = end-start
+    mean = (total[end]-total[start])/n
+    variance = (squares[end]-squares[start])/n - mean*mean
+    return mean, np.sqrt(np.maximum(variance,0))
+
+
+def summarise_history(times,temps,lights,tempLow,tempHigh,window=statsWindow):
+    """
+    Function that works out rolling statistics, anomaly scores and how long the room spent
+    in the comfortable temperature range.
+
+    Args:
+        times (Array): When each sample was taken in seconds
+        temps (Array): Temperature of each sample in degrees C
+        lights (Array): Light intensity of each sample in lux
+        tempLow (Integer): The lower bound of the comfortable temperature range
+        tempHigh (Integer): The upper bound of the comfortable temperature range
+        window (Integer): How many samples the rolling statistics are over
+
+    Returns:
+        summary (Dictionary): Statistics of the history, all plain numbers
+    """
+    summary = {'samples': len(times)}
+    if len(times) == 0:
+        return summary
+    for column, values in (('temp',temps),('light',lights)):
+        summary[f'{column}Mean'] = float(values.mean())
+        summary[f'{column}Std'] = float(values.std())
+        summary[f'{column}Min'] = float(values.min())
+        summary[f'{column}Max'] = float(values.max())
+
+    # How far each sample is from the samples just before it, in standard deviations
+    mean, std = rolling_stats(temps,window)
+    previousMean = np.concatenate(([temps[0]],mean[:-1]))
+    previousStd = np.concatenate(([0.0],std[:-1]))
+    with np.errstate(divide='ignore',invalid='ignore'):
+        scores = np.where(previousStd > 0,np.abs(temps-previousMean)/previousStd,0.0)
+    worst = int(np.argmax(scores))
+    summary['anomalies'] = int(np.count_nonzero(scores > anomalyScore))
+    summary['worstScore'] = float(scores[worst])
+    summary['worstTime'] = float(times[worst])
+
+    # Slopes fitted to fewer samples than a full window are mostly noise, so they're left out
+    slopes = analysis.rolling_slopes(times,temps)[analysis.slopeWindow-1:]
+    if len(slopes) > 0:
+        summary['steepestSlope'] = float(slopes[np.argmax(np.abs(slopes))])
+
+    # Each sample counts for the time until the next one
+    durations = np.diff(times,append=times[-1])
+    total = durations.sum()
+    if total > 0:
+        summary['comfortable'] = float(durations[(temps >= tempLow) & (temps <= tempHigh)].sum()/total)
+        summary['tooCold'] = float(durations[temps < tempLow].sum()/total)
+        summary['tooHot'] = float(durations[temps > tempHigh].sum()/total)
+    return summary
+
+
+def summarise(name,length,tempLow,tempHigh,window=statsWindow):
+    """
+    Function that analyses a history snapshot in shared memory. Runs in a worker process,
+    and only the small summary goes back.
+
+    Args:
+        name (String): Name of the shared memory block holding the time, temperature and light rows
+        length (Integer): How many samples are in the snapshot
+        tempLow (Integer): The lower bound of the comfortable temperature range
+        tempHigh (Integer): The upper bound of the comfortable temperature range
+        window (Integer): How many samples the rolling statistics are over
+
+    Returns:
+        summary (Dictionary): Statistics of the snapshot, all plain numbers
+    """
+    # Workers share the resource tracker of the process that made the block, which removes it
+    block = shared_memory.SharedMemory(name=name)
+    try:
+        # Nothing can still be looking at the block once this returns, so it can be closed
+        return summarise_history(*np.ndarray((len(columns),length),dtype=float,buffer=block.buf),tempLow,tempHigh,window)
+    finally:
+        block.close()
+
+
+class AnalyticsWorker:
+    """
+    Class that runs history analysis in another process, so neither the control loop nor the
+    menu waits on it. Snapshots go across in shared memory rather than being pickled.
+
+    Args:
+        processes (Integer): How many worker processes to use
+        startMethod (String): How the worker processes are started, see multiprocessing.get_context
+    """
+    def __init__(self,processes=1,startMethod=startMethod):
+        self.executor = ProcessPoolExecutor(processes,mp_context=multiprocessing.get_context(startMethod))
+        self.latest = None
+
+    def submit(self,history,settings,last=None):
+        """
+        Function that copies the newest history into shared memory and starts analysing it.
+        Returns straight away.
+
+        Args:
+            history (SensorHistory): The sensor history
+            settings (Settings): The settings set by the user, for the comfortable temperature range
+            last (Integer): Only analyse this many of the newest samples. Defaults to all of them.
+
+        Returns:
+            future (Future): Gives the summary once it's done
+        """
+        # Copied while holding the history's lock, so a sample can't be half written
+        with history.lock:
+            views = [history.view(column,last) for column in columns]
+            length = len(views[0])
+            block = shared_memory.SharedMemory(create=True,size=max(len(columns)*length*8,1))
+            np.ndarray((len(columns),length),dtype=float,buffer=block.buf)[:] = views
+        future = self.executor.submit(summarise,block.name,length,settings.tempLow,settings.tempHigh)
+
+        def finished(future):
+            block.close()
+            block.unlink()
+            if not future.cancelled() and future.exception() is None:
+                self.latest = future.result()
+
+        future.add_done_callback(finished)
+        return future
+
+    def shutdown(self):
+        """
+        Function that stops the worker processes once any analysis still running has finished.
+        """
+        self.executor.shutdown()
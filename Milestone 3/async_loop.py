@@ -0,0 +1,208 @@
+"""
+Async Polling Loop function file
+Created by: Team D09
+Version: 1
+Last modified: 18/10/2026
+"""
+
+import asyncio
+import time
+import sevseg
+import sensors as sens
+import shift_register as shreg
+import Polling_Loop as ploop
+from instrumentation import timer
+sampleTime = 0.05
+controlTime = 0.5
+queueSize = 20
+
+
+class AsyncBoard:
+    """
+    Class that lets coroutines use the normal (blocking) board.
+    Every call runs in a worker thread so the event loop never waits on the serial port.
+
+    Args:
+        board: The Arduino
+    """
+    def __init__(self,board):
+        self.board = board
+
+    async def analog_read(self,pin):
+        return await asyncio.to_thread(self.board.analog_read,pin)
+
+    async def shift_out(self,pattern,serialPin=ploop.serialPinOutputs,rclckPin=ploop.rclckPinOutputs,srclckPin=ploop.srclckPinOutputs):
+        return await asyncio.to_thread(shreg.shift_out,pattern,self.board,serialPin,rclckPin,srclckPin)
+
+    async def run(self,func,*args):
+        return await asyncio.to_thread(func,*args)
+
+
+def _put_latest(queue,item):
+    """
+    Function that puts an item on a queue, dropping the oldest item if the queue is full.
+
+    Args:
+        queue (asyncio.Queue): The queue
+        item: The item to put on the queue
+    """
+    if queue.full():
+        queue.get_nowait()
+    queue.put_nowait(item)
+
+
+async def sample_task(aboard,samples,sampleTime=sampleTime,thermIn=ploop.thermIn,lightIn=ploop.lightIn):
+    """
+    Coroutine that takes the newest filtered readings of both sensors every sampleTime seconds.
+
+    Args:
+        aboard (AsyncBoard): The Arduino
+        samples (asyncio.Queue): Queue the (time, raw thermistor, raw LDR, filtered thermistor, filtered LDR) readings are put on
+        sampleTime (Float): Time between samples in seconds
+        thermIn (Integer): Analog pin number for the thermistor
+        lightIn (Integer): Analog pin number for the LDR
+    """
+    # Readings come in through the sensors' callbacks and filters, so taking them never waits on the board
+    sensors = sens.attach(aboard.board,[thermIn,lightIn])
+    lastSample = 0.0
+    while True:
+        start = time.time()
+        with timer.stage('analog reads'):
+            filteredTemp, readTime = sensors.filtered_read(thermIn)
+            filteredLight = sensors.filtered_read(lightIn)[0]
+            rawTemp = sensors.analog_read(thermIn)[0]
+            rawLight = sensors.analog_read(lightIn)[0]
+        # Only new readings are passed on, stamped with when the board took them
+        if readTime > lastSample:
+            lastSample = readTime
+            _put_latest(samples,(readTime,rawTemp,rawLight,filteredTemp,filteredLight))
+        await asyncio.sleep(max(0,sampleTime-(time.time()-start)))
+
+
+async def control_task(state,settings,aboard,display,samples,leds,messages,controlTime=controlTime):
+    """
+    Coroutine that stores every sample and decides the outputs every controlTime seconds.
+
+    Args:
+        state (ControlState): The current temperature, the current light and the sensor history
+        settings (Settings): The settings set by the user. This consists of the upper and lower bound of the temperature and fan speed
+        aboard (AsyncBoard): The Arduino
+        display (SevsegDisplay): The seven segment display
+        samples (asyncio.Queue): Queue the sensor readings come from
+        leds (asyncio.Queue): Queue the shift register patterns are put on
+        messages (asyncio.Queue): Queue the display messages are put on
+        controlTime (Float): Time between output decisions in seconds
+    """
+    history = state.history
+    lastControl = 0
+    while True:
+        sampleStart, rawTemp, rawLight, filteredTemp, filteredLight = await samples.get()
+        # The history gets the filtered readings, the log keeps the raw ones
+        state = ploop.update_temp(state,filteredTemp)
+        state = ploop.update_light(state,filteredLight)
+        with timer.stage('gradient'):
+            history.append(sampleStart,state.currentTemp,state.currentLight)
+        if state.log is not None:
+            with timer.stage('log'):
+                state.log.append(sampleStart,rawTemp,rawLight,state.currentTemp,state.currentLight)
+
+        if sampleStart-lastControl < controlTime:
+            continue
+        lastControl = sampleStart
+        alerted = False
+        if ploop.rapid_changing_temp_check(history.gradient):
+            # Holds the alert pins without holding up sampling or the display
+            _put_latest(leds,'change')
+            await aboard.run(ploop.rapid_changing_temp,history.gradient,1,aboard.board,display)
+            alerted = True
+        key = ploop.output_state(state.currentTemp,state.currentLight,settings,state.outputKey)
+        pattern, report = ploop.outputFrames[key]
+        # The LEDs only need writing when the state changes or the alert pattern replaced them
+        if key != state.outputKey or alerted:
+            _put_latest(leds,pattern)
+        state.outputKey = key
+        _put_latest(messages,str(round(state.currentTemp))+'*c')
+        print(report.format(temp=state.currentTemp,speed=key[1]))
+        print(f"Light intensity: {round(state.currentLight,2)} lux")
+
+
+async def led_task(aboard,leds):
+    """
+    Coroutine that shifts out every pattern put on the LED queue.
+
+    Args:
+        aboard (AsyncBoard): The Arduino
+        leds (asyncio.Queue): Queue the shift register patterns come from
+    """
+    while True:
+        pattern = await leds.get()
+        with timer.stage('shift register'):
+            await aboard.shift_out(pattern)
+
+
+async def display_task(aboard,display,messages):
+    """
+    Coroutine that keeps the seven segment display multiplexed, picking up new messages between frames.
+
+    Args:
+        aboard (AsyncBoard): The Arduino
+        display (SevsegDisplay): The seven segment display
+        messages (asyncio.Queue): Queue the display messages come from
+    """
+    while True:
+        while not messages.empty():
+            display.set_message(messages.get_nowait())
+        await aboard.run(display.refresh_once)
+
+
+async def run(state,settings,board,sampleTime=sampleTime,controlTime=controlTime):
+    """
+    Coroutine that runs every part of the control loop at its own rate until cancelled.
+
+    Args:
+        state (ControlState): The current temperature, the current light and the sensor history
+        settings (Settings): The settings set by the user. This consists of the upper and lower bound of the temperature and fan speed
+        board: The Arduino
+        sampleTime (Float): Time between samples in seconds
+        controlTime (Float): Time between output decisions in seconds
+    """
+    aboard = AsyncBoard(board)
+    display = sevseg.SevsegDisplay(board)
+    samples = asyncio.Queue(queueSize)
+    leds = asyncio.Queue(queueSize)
+    messages = asyncio.Queue(queueSize)
+    # The board reports often enough to give the filters a full group every sample
+    sens.set_sampling_interval(board,min(sampleTime/sens.attach(board).oversampling,sens.maxReportInterval))
+    try:
+        await asyncio.gather(
+            sample_task(aboard,samples,sampleTime),
+            control_task(state,settings,aboard,display,samples,leds,messages,controlTime),
+            led_task(aboard,leds),
+            display_task(aboard,display,messages))
+    finally:
+        display.stop()
+        shreg.shift_out('reset',board)
+        sens.set_sampling_interval(board)
+        state.outputKey = None
+        if state.log is not None:
+            state.log.flush()
+
+
+def polling_loop(state,settings,board):
+    """
+    The asyncio version of the main polling loop function for the system.
+
+    Args:
+        state (ControlState): The current temperature, the current light and the sensor history
+        settings (Settings): The settings set by the user. This consists of the upper and lower bound of the temperature and fan speed
+        board: The Arduino
+
+    Returns:
+        state (ControlState): The current temperature, the current light and the sensor history
+    """
+    print("Ctrl + C to stop")
+    try:
+        asyncio.run(run(state,settings,board))
+    except KeyboardInterrupt:
+        pass
+    return state
@@ -0,0 +1,117 @@
+"""
+Background Control Loop file
+Created by: Team D09
+Version: 1
+Last modified: 18/10/2026
+"""
+
+import traceback
+import dataclasses
+import threading
+import Polling_Loop as ploop
+
+
+class SettingsChannel:
+    """
+    Class that passes settings from the menu to a control loop on another thread.
+    The loop only ever sees a whole set of settings, never a temperature range that's half changed.
+
+    Args:
+        settings (Settings): The settings to start with
+    """
+    def __init__(self,settings):
+        self._settings = dataclasses.replace(settings)
+
+    def set(self,settings):
+        """
+        Function that hands new settings to the loop. It picks them up at the start of its next cycle.
+
+        Args:
+            settings (Settings): The new settings. Copied, so changing them afterwards doesn't affect the loop.
+        """
+        # Swapping a single reference is atomic, so the loop doesn't need a lock to read it
+        self._settings = dataclasses.replace(settings)
+
+    def get(self):
+        """
+        Function that gives the newest settings.
+
+        Returns:
+            settings (Settings): The newest settings
+        """
+        return self._settings
+
+
+class ControlWorker:
+    """
+    Class that keeps the polling loop running on a background thread, so the system keeps
+    regulating the temperature while the menus are in use. If the loop fails, the error is
+    shown and kept as error.
+
+    Args:
+        board: The Arduino
+    """
+    def __init__(self,board):
+        self.board = board
+        self.settings = None
+        self.state = None
+        self.error = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def is_running(self):
+        """
+        Function that checks if the loop is running.
+
+        Returns:
+            Boolean: True if the loop is running
+        """
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self,state,settings):
+        """
+        Function that starts the loop in the background if it isn't running already. Returns straight away.
+
+        Args:
+            state (ControlState): The current temperature, the current light and the sensor history. Kept up to date by the loop.
+            settings (Settings): The settings set by the user. This consists of the upper and lower bound of the temperature and fan speed
+        """
+        if self.is_running():
+            return
+        self.state = state
+        self.settings = SettingsChannel(settings)
+        self.error = None
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run,daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        try:
+            self.state = ploop.polling_loop(self.state,self.settings.get(),self.board,stop=self._stop,settingsChannel=self.settings,verbose=False)
+        except Exception as error:
+            self.error = error
+            print(f"Control loop stopped: {error!r}")
+            traceback.print_exc()
+
+    def update_settings(self,settings):
+        """
+        Function that swaps new settings into the running loop without restarting it.
+
+        Args:
+            settings (Settings): The new settings
+        """
+        if self.settings is not None:
+            self.settings.set(settings)
+
+    def stop(self):
+        """
+        Function that stops the loop and waits for it to turn the outputs off.
+
+        Returns:
+            state (ControlState): The state the loop finished in, None if it was never started
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        return self.state
@@ -0,0 +1,276 @@
+"""
+Benchmark file
+Created by: Team D09
+Version: 1
+Last modified: 18/10/2026
+
+Runs the hot paths of the system against a simulated board.
+    python benchmark.py                         show the results
+    python benchmark.py --save baseline.json    save them as a baseline
+    python benchmark.py --compare baseline.json fail if anything got worse than the baseline
+"""
+
+import io
+import sys
+import json
+import timeit
+import argparse
+import tracemalloc
+import contextlib
+import numpy as np
+import analysis
+import simulated_board as simb
+import sevseg
+import records as rec
+import shift_register as shreg
+import Polling_Loop as ploop
+cycles = 200
+repeats = 5
+threshold = 1.0
+slopeTolerance = 1e-9
+digitalPins = [3,4,5,6,7,8,9,10,11,12,13,16,17]
+# For every metric, whether a bigger number is worse, whether it's a timing so the threshold applies (timings
+# change from one run to the next, the counters don't), and the smallest change that isn't noise
+metrics = {
+    'wallTime': (True,True,10e-6),
+    'messages': (True,False,0.01),
+    'writes': (True,False,0.01),
+    'bytes': (True,False,0.01),
+    'allocations': (True,False,2.0),
+    'allocatedBytes': (True,False,512.0),
+    'rate': (False,True,10e-6),
+}
+
+
+def make_board():
+    """
+    Function that makes a simulated board with the pins set up like main.py does.
+
+    Returns:
+        board (SimulatedBoard): The board, with the room warming slowly
+    """
+    board = simb.SimulatedBoard(temperature=simb.ramp(15,0.01,high=30),light=simb.sine(800,400,60))
+    for pin in digitalPins:
+        board.set_pin_mode_digital_output(pin)
+    return board
+
+
+def make_paths(board):
+    """
+    Function that sets up each hot path as a function that runs it once.
+
+    Args:
+        board (SimulatedBoard): The board to run against
+
+    Returns:
+        paths (Dictionary): Name of the path to the function
+    """
+    state = rec.ControlState()
+    settings = rec.Settings()
+    display = sevseg.SevsegDisplay(board,refreshTime=0)
+
+    def polling_cycle():
+        ploop.get_temp(state,board)
+        ploop.get_light(state,board)
+        state.history.append(board.now(),state.currentTemp,state.currentLight)
+        state.outputKey = ploop.outputs(state.currentTemp,state.history.gradient,state.currentLight,settings,board,display,state.outputKey)
+        # The display is refreshed in the background while the loop runs, so its traffic is part of each cycle
+        display.refresh_once()
+
+    def outputs():
+        state.outputKey = ploop.outputs(state.currentTemp,state.history.gradient,state.currentLight,settings,board,display,state.outputKey)
+
+    def shift_out():
+        shreg.shift_out('heat2Cold',board)
+        shreg.shift_out('reset',board)
+
+    return {
+        'polling_cycle': polling_cycle,
+        'outputs': outputs,
+        'shift_out': shift_out,
+        'write_sevseg': lambda: sevseg.write_sevseg('21*c',0,board),
+        'display_refresh': display.refresh_once,
+        'get_temp': lambda: ploop.get_temp(state,board),
+        'get_light': lambda: ploop.get_light(state,board),
+    }
+
+
+def measure(path,board,cycles=cycles):
+    """
+    Function that runs a hot path repeatedly and measures it.
+
+    Args:
+        path (Function): The hot path
+        board (SimulatedBoard): The board it runs against
+        cycles (Integer): How many times to run it for the board counters and allocations
+
+    Returns:
+        result (Dictionary): Wall time, Firmata messages, serial writes, bytes, allocations and allocated bytes per call,
+        and the calls per second once the serial cost of each call on the board is added to its wall time.
+        Allocations are the memory blocks each call leaves behind, and allocated bytes are the most memory
+        each call has allocated at once.
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        path()
+        board.reset_counters()
+        clock = board.clock
+        for i in range(cycles):
+            path()
+        messages = board.messages/cycles
+        writes = board.writes/cycles
+        sentBytes = board.bytesSent/cycles
+        serialTime = (board.clock-clock)/cycles
+
+        # Paths that take microseconds are run enough times for the clock to resolve them, and the
+        # quickest of a few runs is the least affected by whatever else the machine is doing
+        stopwatch = timeit.Timer(path)
+        number = stopwatch.autorange()[0]
+        wallTime = min(stopwatch.repeat(repeats,number))/number
+
+        # Allocations are counted on a separate run so tracing doesn't slow the timed one.
+        # Each call is measured on its own, so memory freed by a later call doesn't hide it.
+        allocations = 0
+        allocatedBytes = 0
+        tracemalloc.start()
+        for i in range(cycles):
+            blocks = sys.getallocatedblocks()
+            tracemalloc.reset_peak()
+            current = tracemalloc.get_traced_memory()[0]
+            path()
+            allocatedBytes += tracemalloc.get_traced_memory()[1] - current
+            allocations += max(sys.getallocatedblocks()-blocks,0)
+        tracemalloc.stop()
+    return {
+        'wallTime': wallTime,
+        'messages': messages,
+        'writes': writes,
+        'bytes': sentBytes,
+        'allocations': allocations/cycles,
+        'allocatedBytes': allocatedBytes/cycles,
+        'rate': 1/(wallTime+serialTime),
+    }
+
+
+def run_benchmarks(cycles=cycles):
+    """
+    Function that measures every hot path.
+
+    Args:
+        cycles (Integer): How many times to run each path
+
+    Returns:
+        results (Dictionary): Name of the path to its measurements
+    """
+    # Analog readings come straight from analog_read here, not through callbacks.
+    # Each path gets its own board so the counters don't depend on how long the paths before it were timed for.
+    results = {}
+    for name in make_paths(make_board()):
+        board = make_board()
+        results[name] = measure(make_paths(board)[name],board,cycles)
+        board.shutdown()
+    return results
+
+
+def check_slopes(days=21,samples=20000,sampleTime=0.5):
+    """
+    Function that checks the rolling slopes of a long history against fitting each window on its own,
+    since the slopes used to lose precision as the history got longer.
+
+    Args:
+        days (Float): How far into the history the samples start
+        samples (Integer): How many samples to check
+        sampleTime (Float): Time between samples in seconds
+
+    Returns:
+        error (Float): The biggest difference between the two in degrees C per second
+    """
+    times = days*86400 + np.arange(samples)*sampleTime
+    temps = 19 + 0.01*(times-times[0]) + np.random.default_rng(0).normal(0,0.05,samples)
+    slopes = analysis.rolling_slopes(times,temps)
+    window = analysis.slopeWindow
+    expected = [analysis.window_slope(times[max(end-window,0):end],temps[max(end-window,0):end]) for end in range(1,samples+1)]
+    return float(np.abs(slopes-expected).max())
+
+
+def compare(results,baseline,threshold=threshold):
+    """
+    Function that finds every metric that got worse than the baseline. Timings are allowed the threshold,
+    while the board counters and allocations count if they change at all. Changes smaller than the
+    metric's noise floor are ignored.
+
+    Args:
+        results (Dictionary): The new measurements
+        baseline (Dictionary): The saved measurements
+        threshold (Float): Allowed change in timings as a fraction, e.g. 1.0 for twice as slow
+
+    Returns:
+        regressions (List): Description of each regression
+    """
+    regressions = []
+    for name, old in baseline.items():
+        if name not in results:
+            continue
+        for metric, (biggerIsWorse, varies, noiseFloor) in metrics.items():
+            if metric not in old:
+                continue
+            before = old[metric]
+            after = results[name][metric]
+            if biggerIsWorse:
+                change = after-before
+                allowed = threshold*abs(before) if varies else 0.0
+            else:
+                # Rates are compared as time per call, so they share the noise floor of wall time
+                change = 1/after-1/before
+                allowed = threshold/before if varies else 0.0
+            if change > max(allowed,noiseFloor):
+                regressions.append(f"{name} {metric}: {before:.6g} -> {after:.6g}")
+    return regressions
+
+
+def print_results(results):
+    """
+    Function that shows the measurements as a table.
+
+    Args:
+        results (Dictionary): Name of the path to its measurements
+    """
+    print(f"{'Path':<18}{'Time (ms)':>11}{'Rate (/s)':>11}{'Messages':>10}{'Writes':>8}{'Bytes':>9}{'Allocs':>9}{'Alloc B':>10}")
+    for name, result in results.items():
+        print(f"{name:<18}{result['wallTime']*1000:>11.3f}{result['rate']:>11.1f}{result['messages']:>10.1f}{result['writes']:>8.1f}"
+              f"{result['bytes']:>9.1f}{result['allocations']:>9.1f}{result['allocatedBytes']:>10.1f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the control loop, display driver and conversion paths")
+    parser.add_argument('--cycles',type=int,default=cycles,help="times each path is run for the counters and allocations")
+    parser.add_argument('--save',metavar='FILE',help="save the results as a baseline")
+    parser.add_argument('--compare',metavar='FILE',help="fail if the results are worse than this baseline")
+    parser.add_argument('--threshold',type=float,default=threshold,help="allowed regression in timings as a fraction (default 1.0, twice as slow)")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.cycles)
+    print_results(results)
+    slopeError = check_slopes()
+    print(f"Rolling slope error: {slopeError:.3g} C/s")
+    if slopeError > slopeTolerance:
+        print("Rolling slopes don't match fitting each window")
+        return 1
+    if args.save:
+        with open(args.save,'w') as file:
+            json.dump(results,file,indent=2)
+        print(f"Saved baseline to {args.save}")
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)
+        regressions = compare(results,baseline,args.threshold)
+        if regressions:
+            print("Regressions:")
+            for regression in regressions:
+                print(f"  {regression}")
+            return 1
+        print("No regressions")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
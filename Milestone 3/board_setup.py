@@ -0,0 +1,119 @@
+"""
+Board Setup function file
+Created by: Team D09
+Version: 1
+Last modified: 18/10/2026
+"""
+
+import threading
+from concurrent.futures import Future
+import sensors as sens
+import simulated_board as simb
+from instrumentation import timer
+digitalPins = [3,4,5,6,7,8,9,10,11,12,13,16,17]
+analogPins = [0,1]
+
+
+def connect(simulate=False,digitalPins=digitalPins,analogPins=analogPins,comPort=None,timer=timer):
+    """
+    Function that connects to the Arduino and sets up every pin the system uses.
+
+    Args:
+        simulate (Boolean): Use a simulated board instead of an Arduino
+        digitalPins (List): Pins used as digital outputs
+        analogPins (List): Pins the sensors are on
+        comPort (String): Serial port the Arduino is on. Defaults to the first one found.
+        timer (StageTimer): Where the handshake and pin setup times are recorded
+
+    Returns:
+        board: The Arduino, ready to use
+    """
+    with timer.stage('board handshake'):
+        if simulate:
+            # Runs without an Arduino, with the room drifting slowly around 19 C
+            board = simb.SimulatedBoard(temperature=simb.sine(19,4,600),realtime=True)
+        else:
+            from pymata4 import pymata4
+            board = pymata4.Pymata4(com_port=comPort)
+    return set_up_pins(board,digitalPins,analogPins,timer)
+
+
+def set_up_pins(board,digitalPins=digitalPins,analogPins=analogPins,timer=timer):
+    """
+    Function that sets up every pin the system uses on a board that's already connected.
+
+    Args:
+        board: The Arduino
+        digitalPins (List): Pins used as digital outputs
+        analogPins (List): Pins the sensors are on
+        timer (StageTimer): Where the pin setup time is recorded
+
+    Returns:
+        board: The Arduino, ready to use
+    """
+    with timer.stage('pin setup'):
+        for pin in digitalPins:
+            board.set_pin_mode_digital_output(pin)
+        # Analog pins report through callbacks into timestamped buffers
+        sens.attach(board,analogPins)
+    return board
+
+
+def connect_in_background(simulate=False,digitalPins=digitalPins,analogPins=analogPins):
+    """
+    Function that starts connecting to the Arduino in a background thread, so the
+    user can get on with the PIN and menus during the handshake.
+
+    Args:
+        simulate (Boolean): Use a simulated board instead of an Arduino
+        digitalPins (List): Pins used as digital outputs
+        analogPins (List): Pins the sensors are on
+
+    Returns:
+        ready (Future): Gives the board once it's ready, or raises whatever stopped it connecting
+    """
+    ready = Future()
+
+    def run():
+        ready.set_running_or_notify_cancel()
+        try:
+            ready.set_result(connect(simulate,digitalPins,analogPins))
+        except BaseException as error:
+            ready.set_exception(error)
+
+    threading.Thread(target=run,daemon=True).start()
+    return ready
+
+
+def wait_for(ready):
+    """
+    Function that gives the board, waiting for it to finish connecting if it hasn't yet.
+    If it couldn't connect, e.g. no Arduino is plugged in, the error is shown instead.
+
+    Args:
+        ready (Future): From connect_in_background
+
+    Returns:
+        board: The Arduino, ready to use, or None if it couldn't connect
+    """
+    if not ready.done():
+        print("Waiting for the board to connect...")
+    try:
+        return ready.result()
+    except Exception as error:
+        print(f"Couldn't connect to the board: {error}")
+        return None
+
+
+def shutdown(ready):
+    """
+    Function that disconnects from the board once it's finished connecting, if it connected at all.
+
+    Args:
+        ready (Future): From connect_in_background
+    """
+    try:
+        board = ready.result()
+    except Exception:
+        return
+    board.shutdown()
@@ -0,0 +1,159 @@
+"""
+Sensor Calibration function file
+Created by: Team D09
+Version: 1
+Last modified: 18/10/2026
+"""
+
+import os
+import math
+import hashlib
+import numpy as np
+adcSize = 1024
+tempCoefficients = (83.966601613537950,-0.116185042196742)
+lightCoefficients = (1560.31496068566,-0.0006516603208904828)
+cacheDir = os.path.join(os.path.dirname(os.path.abspath(__file__)),'calibration_cache')
+
+
+def build_table(coefficients):
+    """
+    Function that works out the calibration curve for every possible 10-bit reading.
+    Readings the voltage divider can't give a resistance for (0 V and 5 V) are NaN.
+
+    Args:
+        coefficients (Tuple): (a, b) of the curve a*exp(b*R), where R is the sensor resistance in kOhm
+
+    Returns:
+        table (numpy.ndarray): The converted value for each reading
+    """
+    a, b = coefficients
+    voltOut = np.arange(adcSize)*(5/1023)
+    with np.errstate(divide='ignore',invalid='ignore'):
+        resistance = ((voltOut*10)/5)/(1-(voltOut/5))
+        table = a*np.exp(b*resistance)
+    table[(voltOut <= 0) | (voltOut >= 5)] = np.nan
+    return table
+
+
+def load_table(coefficients,cacheDir=cacheDir):
+    """
+    Function that loads a calibration table saved for these coefficients,
+    building and saving it first if there isn't one.
+
+    Args:
+        coefficients (Tuple): (a, b) of the curve a*exp(b*R)
+        cacheDir (String): Folder the tables are saved in
+
+    Returns:
+        table (numpy.ndarray): The converted value for each reading
+    """
+    key = hashlib.sha1(repr(tuple(coefficients)).encode()).hexdigest()[:16]
+    path = os.path.join(cacheDir,f"table_{key}.npy")
+    try:
+        table = np.load(path)
+        if table.shape == (adcSize,):
+            return table
+    except (OSError,ValueError):
+        pass
+    table = build_table(coefficients)
+    try:
+        os.makedirs(cacheDir,exist_ok=True)
+        np.save(path,table)
+    except OSError:
+        # Saving only speeds up the next start, so carry on without it
+        pass
+    return table
+
+
+tempTable = load_table(tempCoefficients)
+lightTable = load_table(lightCoefficients)
+readings = np.arange(adcSize)
+
+
+def lookup(table,raw):
+    """
+    Function that looks a reading up in a calibration table. Fractional readings, like the
+    filtered ones, are interpolated between the two readings either side.
+
+    Args:
+        table (numpy.ndarray): The converted value for each reading
+        raw (Float): The 10-bit analog reading
+
+    Returns:
+        value (Float): The converted value, NaN if the reading is out of range
+    """
+    if not 0 <= raw <= adcSize-1:
+        return math.nan
+    index = int(raw)
+    fraction = raw - index
+    if fraction == 0:
+        return float(table[index])
+    return float(table[index] + fraction*(table[index+1]-table[index]))
+
+
+def raw_to_temp(raw):
+    """
+    Function that converts a raw thermistor reading to temperature.
+
+    Args:
+        raw (Float): The 10-bit analog reading
+
+    Returns:
+        temp (Float): Temperature in degrees C, NaN if the reading is out of range
+    """
+    return lookup(tempTable,raw)
+
+
+def raw_to_lux(raw):
+    """
+    Function that converts a raw LDR reading to light intensity.
+
+    Args:
+        raw (Float): The 10-bit analog reading
+
+    Returns:
+        lux (Float): Light intensity in lux, NaN if the reading is out of range
+    """
+    return lookup(lightTable,raw)
+
+
+def lookup_many(table,raws):
+    """
+    Function that looks a whole array of readings up in a calibration table, interpolating
+    fractional readings the same way lookup does.
+
+    Args:
+        table (numpy.ndarray): The converted value for each reading
+        raws (Array): 10-bit analog readings
+
+    Returns:
+        values (numpy.ndarray): The converted values, NaN where a reading is out of range
+    """
+    raws = np.asarray(raws,dtype=float)
+    return np.where((raws >= 0) & (raws <= adcSize-1),np.interp(raws,readings,table),np.nan)
+
+
+def temps_from_raw(raws):
+    """
+    Function that converts a whole array of raw thermistor readings in one go.
+
+    Args:
+        raws (Array): 10-bit analog readings, filtered or not
+
+    Returns:
+        temps (numpy.ndarray): Temperatures in degrees C, NaN where a reading is out of range
+    """
+    return lookup_many(tempTable,raws)
+
+
+def lux_from_raw(raws):
+    """
+    Function that converts a whole array of raw LDR readings in one go.
+
+    Args:
+        raws (Array): 10-bit analog readings, filtered or not
+
+    Returns:
+        lux (numpy.ndarray): Light intensities in lux, NaN where a reading is out of range
+    """
+    return lookup_many(lightTable,raws)
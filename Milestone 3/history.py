@@ -0,0 +1,414 @@
+"""
+Sensor History function file
+Created by: Team D09
+Version: 1
+Last modified: 18/10/2026
+"""
+
+import os
+import zipfile
+import threading
+import numpy as np
+import analysis
+historySize = 28800
+columns = ('time','temp','grad','light')
+plotPoints = 500
+# Bucket size in seconds to how many buckets are kept: 6 hours, 2 weeks and a year
+rollupSizes = {1: 21600, 60: 20160, 3600: 8760}
+stats = ('min','max','mean')
+
+
+def rollup_path(logPath):
+    """
+    Function that gives where the rollups of a sample log are saved.
+
+    Args:
+        logPath (String): The sample log file
+
+    Returns:
+        path (String): The rollup file next to it
+    """
+    return os.path.splitext(logPath)[0] + '_rollups.npz'
+
+
+class Rollup:
+    """
+    Class that keeps the min, max and mean of every column over fixed time buckets,
+    updated as samples come in. Stored the same mirrored way as SensorHistory, and the
+    bucket still being filled is always the newest one, so plots are up to date.
+
+    Args:
+        resolution (Float): Bucket size in seconds
+        capacity (Integer): How many buckets are kept
+    """
+    def __init__(self,resolution,capacity):
+        self.resolution = resolution
+        self.capacity = capacity
+        self.count = 0
+        # Row 0 is the start time of each bucket, then the min of each column, the max, then the mean
+        width = len(columns)-1
+        self._data = np.zeros((1+len(stats)*width,2*capacity))
+        self._rows = {(name,stat): 1+j*width+i for i, name in enumerate(columns[1:]) for j, stat in enumerate(stats)}
+        self._bucket = None
+        self._n = 0
+        self._sum = [0.0]*width
+        self._min = [0.0]*width
+        self._max = [0.0]*width
+
+    def __len__(self):
+        return min(self.count,self.capacity)
+
+    def add(self,timeStamp,values):
+        """
+        Function that adds a sample to its bucket, starting a new bucket if it's past the current one.
+
+        Args:
+            timeStamp (Float): When the sample was taken in seconds
+            values (Tuple): The sample's temperature, gradient and light
+        """
+        bucket = timeStamp//self.resolution
+        if bucket != self._bucket:
+            self._bucket = bucket
+            self._n = 1
+            self._sum = list(values)
+            self._min = list(values)
+            self._max = list(values)
+            self.count += 1
+        else:
+            self._n += 1
+            for i, value in enumerate(values):
+                self._sum[i] += value
+                if value < self._min[i]:
+                    self._min[i] = value
+                elif value > self._max[i]:
+                    self._max[i] = value
+        column = [bucket*self.resolution,*self._min,*self._max,*(total/self._n for total in self._sum)]
+        index = (self.count-1) % self.capacity
+        self._data[:,index] = column
+        self._data[:,index+self.capacity] = column
+
+    def extend(self,times,values):
+        """
+        Function that adds a whole array of samples in one go, e.g. from the sample log.
+        The samples have to be in time order and newer than anything added already.
+
+        Args:
+            times (Array): When each sample was taken in seconds
+            values (Array): One row per sample of its temperature, gradient and light
+        """
+        times = np.asarray(times,dtype=float)
+        if len(times) == 0:
+            return
+        values = np.asarray(values,dtype=float).reshape(len(times),-1)
+        buckets = times//self.resolution
+        starts = np.flatnonzero(np.concatenate(([True],buckets[1:] != buckets[:-1])))
+        counts = np.diff(np.append(starts,len(times)))
+        sums = np.add.reduceat(values,starts)
+        mins = np.minimum.reduceat(values,starts)
+        maxs = np.maximum.reduceat(values,starts)
+        # Samples in the bucket that's still open join it rather than starting another one
+        merge = int(self._bucket is not None and buckets[0] == self._bucket)
+        if merge:
+            counts[0] += self._n
+            sums[0] += self._sum
+            mins[0] = np.minimum(mins[0],self._min)
+            maxs[0] = np.maximum(maxs[0],self._max)
+        # Only the newest buckets fit
+        keep = np.arange(max(0,len(starts)-self.capacity),len(starts))
+        block = np.vstack((buckets[starts[keep]]*self.resolution,mins[keep].T,maxs[keep].T,(sums[keep]/counts[keep,None]).T))
+        indices = (self.count - merge + keep) % self.capacity
+        self._data[:,indices] = block
+        self._data[:,indices+self.capacity] = block
+        self.count += len(starts) - merge
+        # The last bucket stays open so new samples in the same bucket join it
+        self._bucket = buckets[-1]
+        self._n = int(counts[-1])
+        self._sum = sums[-1].tolist()
+        self._min = mins[-1].tolist()
+        self._max = maxs[-1].tolist()
+
+    def state(self):
+        """
+        Function that gives everything needed to carry on the rollup later, e.g. after a restart.
+
+        Returns:
+            state (Dictionary): Name to array
+        """
+        return {'data': self._data[:,:self.capacity],
+                'counts': np.array([self.count,self._n]),
+                'bucket': np.array([np.nan if self._bucket is None else self._bucket]),
+                'sum': np.array(self._sum),'min': np.array(self._min),'max': np.array(self._max)}
+
+    def load_state(self,state):
+        """
+        Function that carries on a rollup from a saved state.
+
+        Args:
+            state (Dictionary): From state
+        """
+        if state['data'].shape != (self._data.shape[0],self.capacity):
+            raise ValueError("saved rollup is a different size")
+        self._data[:,:self.capacity] = state['data']
+        self._data[:,self.capacity:] = state['data']
+        self.count, self._n = (int(value) for value in state['counts'])
+        bucket = float(state['bucket'][0])
+        self._bucket = None if np.isnan(bucket) else bucket
+        self._sum = state['sum'].tolist()
+        self._min = state['min'].tolist()
+        self._max = state['max'].tolist()
+
+    def view(self,column,stat='mean',last=None):
+        """
+        Function that gives a read-only view of one statistic of a column, oldest bucket first.
+
+        Args:
+            column (String): One of 'time', 'temp', 'grad' or 'light'. Time is the start of each bucket.
+            stat (String): One of 'min', 'max' or 'mean'. Ignored for time. Defaults to the mean.
+            last (Integer): Only give this many of the newest buckets. Defaults to all of them.
+
+        Returns:
+            values (numpy.ndarray): View into the rollup, not a copy
+        """
+        stored = len(self)
+        if last is None or last > stored:
+            last = stored
+        end = (self.count-1) % self.capacity + self.capacity + 1 if self.count else 0
+        row = 0 if column == 'time' else self._rows[(column,stat)]
+        values = self._data[row,end-last:end]
+        values.flags.writeable = False
+        return values
+
+
+class SensorHistory:
+    """
+    Class that stores the sensor history in preallocated NumPy ring buffers.
+    Every column shares one write index, so the time, temperature, gradient and light
+    of a sample always line up.
+
+    Each sample is written twice, capacity apart, so the newest samples are always one
+    contiguous slice and views never need to be copied. Rollups at 1 s, 1 min and 1 h
+    are kept alongside for plotting long stretches of time. Appends and snapshots share a lock,
+    so another thread can plot the history while samples are still being added.
+
+    Args:
+        capacity (Integer): How many samples are kept
+        gradient (GradientTracker): Works out the gradient stored with each sample. Defaults to a new one.
+    """
+    def __init__(self,capacity=historySize,gradient=None):
+        self.capacity = capacity
+        self.gradient = gradient if gradient is not None else analysis.GradientTracker()
+        self.count = 0
+        self._data = np.zeros((len(columns),2*capacity))
+        self._rows = {name: row for row, name in enumerate(columns)}
+        self.rollups = {resolution: Rollup(resolution,size) for resolution, size in rollupSizes.items()}
+        self.lastTime = None
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return min(self.count,self.capacity)
+
+    def bytes_per_sample(self):
+        """
+        Function that gives how much memory the history uses for each sample it can hold.
+
+        Returns:
+            size (Integer): Bytes per sample
+        """
+        return self._data.nbytes // self.capacity
+
+    def append(self,timeStamp,temp,light):
+        """
+        Function that stores a sample, working out the smoothed least-squares gradient over the last few samples.
+
+        Args:
+            timeStamp (Float): When the sample was taken in seconds
+            temp (Float): Temperature in degrees C
+            light (Float): Light intensity in lux
+        """
+        grad = self.gradient.add(timeStamp,temp)
+        index = self.count % self.capacity
+        sample = (timeStamp,temp,grad,light)
+        with self.lock:
+            self._data[:,index] = sample
+            self._data[:,index+self.capacity] = sample
+            self.count += 1
+            self.lastTime = timeStamp
+            for rollup in self.rollups.values():
+                rollup.add(timeStamp,sample[1:])
+
+    def backfill(self,times,temps,grads,lights):
+        """
+        Function that fills the rollups with samples from before this history started,
+        e.g. from the sample log. Has to be called before anything is appended, and the
+        samples have to be newer than any already in the rollups.
+
+        Args:
+            times (Array): When each sample was taken in seconds
+            temps (Array): Temperature of each sample in degrees C
+            grads (Array): Gradient of each sample in degrees C per second
+            lights (Array): Light intensity of each sample in lux
+        """
+        times = np.asarray(times,dtype=float)
+        values = np.column_stack((temps,grads,lights))
+        for rollup in self.rollups.values():
+            # Samples older than the rollup can hold would only be thrown away
+            if len(times):
+                start = np.searchsorted(times,times[-1]-rollup.resolution*(rollup.capacity+1))
+                rollup.extend(times[start:],values[start:])
+        if len(times):
+            self.lastTime = float(times[-1])
+
+    def save_rollups(self,path):
+        """
+        Function that saves the rollups, so the next start only has to add what's been logged since.
+
+        Args:
+            path (String): File to save them to, e.g. from rollup_path
+        """
+        with self.lock:
+            arrays = {f"{resolution}_{name}": values for resolution, rollup in self.rollups.items() for name, values in rollup.state().items()}
+            arrays['lastTime'] = np.array([np.nan if self.lastTime is None else self.lastTime])
+            try:
+                # Written next to the old file and swapped in, so a crash part way never leaves half a file
+                with open(path+'.tmp','wb') as file:
+                    np.savez(file,**arrays)
+                os.replace(path+'.tmp',path)
+            except OSError:
+                # Saving only speeds up the next start, so carry on without it
+                pass
+
+    def load_rollups(self,path):
+        """
+        Function that carries on from rollups saved by save_rollups. Has to be called before anything is added.
+
+        Args:
+            path (String): File they were saved to
+
+        Returns:
+            Boolean: True if they were loaded, False if there weren't any that fit
+        """
+        try:
+            with np.load(path) as saved:
+                for resolution, rollup in self.rollups.items():
+                    rollup.load_state({name: saved[f"{resolution}_{name}"] for name in rollup.state()})
+                lastTime = float(saved['lastTime'][0])
+        except (OSError,ValueError,KeyError,zipfile.BadZipFile):
+            self.rollups = {resolution: Rollup(resolution,size) for resolution, size in rollupSizes.items()}
+            return False
+        self.lastTime = None if np.isnan(lastTime) else lastTime
+        return True
+
+    def restore(self,log,path=None):
+        """
+        Function that fills the rollups from a sample log. Rollups saved at path are carried on from,
+        so only samples logged since they were saved are worked through. Without them, only as far
+        back as the rollups can hold is read. Has to be called before anything is appended.
+
+        Args:
+            log (SampleLog): The sample log
+            path (String): File the rollups were saved to, e.g. from rollup_path
+
+        Returns:
+            lastTime (Float): When the newest sample in the rollups was taken, None if there aren't any
+        """
+        if path is not None:
+            self.load_rollups(path)
+        records = log.read()
+        if len(records) == 0:
+            return self.lastTime
+        times = records['time']
+        if self.lastTime is None:
+            since = times[-1] - max(rollup.resolution*(rollup.capacity+1) for rollup in self.rollups.values())
+        else:
+            since = np.nextafter(self.lastTime,np.inf)
+        start = np.searchsorted(times,since,'left')
+        if start < len(records):
+            # A few samples from before are included so the first gradients have a whole window behind them
+            begin = max(start-2*self.gradient.window,0)
+            tail = records[begin:]
+            # Smoothed the same way as live samples, so the gradient means the same either side of a restart
+            grads = analysis.smoothed_slopes(tail['time'],tail['temp'],self.gradient.window,self.gradient.smoothing)
+            skip = start-begin
+            self.backfill(tail['time'][skip:],tail['temp'][skip:],grads[skip:],tail['light'][skip:])
+        return self.lastTime
+
+    def latest(self,column):
+        """
+        Function that gives the newest value of a column.
+
+        Args:
+            column (String): One of 'time', 'temp', 'grad' or 'light'
+
+        Returns:
+            value (Float): The newest value
+        """
+        return self._data[self._rows[column],(self.count-1) % self.capacity]
+
+    def view(self,column,last=None):
+        """
+        Function that gives a read-only view of a column, oldest sample first.
+
+        Args:
+            column (String): One of 'time', 'temp', 'grad' or 'light'
+            last (Integer): Only give this many of the newest samples. Defaults to all of them.
+
+        Returns:
+            values (numpy.ndarray): View into the history, not a copy
+        """
+        stored = len(self)
+        if last is None or last > stored:
+            last = stored
+        end = (self.count-1) % self.capacity + self.capacity + 1 if self.count else 0
+        values = self._data[self._rows[column],end-last:end]
+        values.flags.writeable = False
+        return values
+
+    def views(self,last=None):
+        """
+        Function that gives time-aligned views of every column.
+
+        Args:
+            last (Integer): Only give this many of the newest samples. Defaults to all of them.
+
+        Returns:
+            views (Dictionary): Column name to view
+        """
+        return {name: self.view(name,last) for name in columns}
+
+    def plot_data(self,column,points=plotPoints):
+        """
+        Function that picks the coarsest resolution that still has enough points to fill a plot,
+        so plotting a month takes about as long as plotting a minute.
+
+        Args:
+            column (String): One of 'temp', 'grad' or 'light'
+            points (Integer): How many points fill the plot
+
+        Returns:
+            data (Dictionary): 'time', 'min', 'max' and 'mean' arrays. For raw samples min, max and mean are the same.
+            They're copies, so they don't change as more samples come in.
+        """
+        with self.lock:
+            data = self._plot_views(column,points)
+            copies = {}
+            for values in data.values():
+                if id(values) not in copies:
+                    copies[id(values)] = values.copy()
+        return {name: copies[id(values)] for name, values in data.items()}
+
+    def _plot_views(self,column,points):
+        rollups = [self.rollups[resolution] for resolution in sorted(self.rollups,reverse=True)]
+        for rollup in rollups:
+            if len(rollup) >= points:
+                break
+        else:
+            # Not enough buckets anywhere, so use the raw samples,
+            # unless the finest rollup goes further back (e.g. it was backfilled from the log)
+            times = self.view('time')
+            rollup = rollups[-1]
+            if len(rollup) == 0 or (len(times) and rollup.view('time')[0]+rollup.resolution > times[0]):
+                values = self.view(column)
+                return {'time': times, 'min': values, 'max': values, 'mean': values}
+        data = {stat: rollup.view(column,stat) for stat in stats}
+        data['time'] = rollup.view('time')
+        return data
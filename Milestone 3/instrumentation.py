@@ -0,0 +1,149 @@
+"""
+Loop Timing function file
+Created by: Team D09
+Version: 1
+Last modified: 18/10/2026
+"""
+
+import math
+import time
+import threading
+from contextlib import contextmanager
+bucketsPerDecade = 10
+minTime = 1e-6
+maxTime = 100
+
+
+class LatencyHistogram:
+    """
+    Class that counts durations into fixed, log-spaced buckets, so it uses the same
+    memory however many durations are recorded. Percentiles are accurate to one bucket
+    (about 25%).
+
+    Args:
+        minTime (Float): Shortest duration with its own bucket in seconds
+        maxTime (Float): Longest duration with its own bucket in seconds
+        bucketsPerDecade (Integer): Buckets for every factor of 10
+    """
+    def __init__(self,minTime=minTime,maxTime=maxTime,bucketsPerDecade=bucketsPerDecade):
+        self.minTime = minTime
+        self.bucketsPerDecade = bucketsPerDecade
+        size = math.ceil(math.log10(maxTime/minTime)*bucketsPerDecade)
+        # One extra bucket at each end for anything out of range
+        self.counts = [0]*(size+2)
+        self.count = 0
+        self.total = 0.0
+        self.longest = 0.0
+
+    def _bucket(self,seconds):
+        if seconds < self.minTime:
+            return 0
+        index = int(math.log10(seconds/self.minTime)*self.bucketsPerDecade) + 1
+        return min(index,len(self.counts)-1)
+
+    def _upper(self,bucket):
+        return self.minTime*10**(bucket/self.bucketsPerDecade)
+
+    def record(self,seconds):
+        """
+        Function that counts a duration.
+
+        Args:
+            seconds (Float): The duration
+        """
+        self.counts[self._bucket(seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.longest = max(self.longest,seconds)
+
+    def percentile(self,percent):
+        """
+        Function that gives the duration the given percentage of records were under.
+
+        Args:
+            percent (Float): Between 0 and 100
+
+        Returns:
+            seconds (Float): Upper edge of the bucket the percentile falls in
+        """
+        if self.count == 0:
+            return 0.0
+        target = self.count*percent/100
+        seen = 0
+        for bucket, count in enumerate(self.counts):
+            seen += count
+            if seen >= target and count:
+                return min(self._upper(bucket),self.longest)
+        return self.longest
+
+
+class StageTimer:
+    """
+    Class that keeps a latency histogram for each named stage of the control loop.
+    """
+    def __init__(self):
+        self.stages = {}
+        self._lock = threading.Lock()
+
+    def record(self,name,seconds):
+        """
+        Function that counts a duration for a stage. Safe to call from any thread.
+
+        Args:
+            name (String): Name of the stage
+            seconds (Float): The duration
+        """
+        with self._lock:
+            if name not in self.stages:
+                self.stages[name] = LatencyHistogram()
+            self.stages[name].record(seconds)
+
+    @contextmanager
+    def stage(self,name):
+        """
+        Function that times the code inside a with block as one stage, using the monotonic clock.
+
+        Args:
+            name (String): Name of the stage
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name,time.perf_counter()-start)
+
+    def reset(self):
+        """
+        Function that forgets every recorded duration.
+        """
+        with self._lock:
+            self.stages = {}
+
+    def report(self):
+        """
+        Function that summarises every stage.
+
+        Returns:
+            report (String): One line per stage with its count, mean, p50, p95, p99 and max in ms
+        """
+        lines = [f"{'Stage':<16}{'Count':>8}{'Mean':>10}{'p50':>10}{'p95':>10}{'p99':>10}{'Max':>10}"]
+        with self._lock:
+            for name, hist in self.stages.items():
+                values = [hist.total/hist.count,hist.percentile(50),hist.percentile(95),hist.percentile(99),hist.longest]
+                lines.append(f"{name:<16}{hist.count:>8}" + "".join(f"{value*1000:>10.2f}" for value in values))
+        return "\n".join(lines)
+
+    def dump(self,path):
+        """
+        Function that writes the summary to a file.
+
+        Args:
+            path (String): File to write to
+        """
+        with open(path,'w') as file:
+            file.write("Loop stage timings (ms)\n")
+            file.write(self.report() + "\n")
+
+
+# Shared by the polling loops and the display thread
+timer = StageTimer()
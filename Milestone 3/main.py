@@ -5,54 +5,91 @@ Version: 2
 Last modified: 13/10/2023
 """
 # Importing main modules
-import math
 import time
-from pymata4 import pymata4
-import matplotlib
-
-# Defining board and pins
-board = pymata4.Pymata4()
-digitalPins = [3,4,5,6,7,8,9,10,11,12,13,16,17]
-analogPins = [0,1]
-
-for pin in digitalPins:
-    board.set_pin_mode_digital_output(pin)
-for pin in analogPins:
-    board.set_pin_mode_analog_input(pin)
-    
-# Set up initial variables
-tempHigh = 20
-tempLow = 18
-currentTemp = 0
-ventSpeed = 1
-currentLight = 0
-tempData = []
-gradData = []
-lightData = []
-timeData = [0]
-dataset = [currentTemp,tempData,gradData,currentLight,lightData,timeData]
-settings = [tempLow, tempHigh, ventSpeed]
-
-# Importing self made modules
+startTime = time.perf_counter()
+import math
+import sys
+import history as hist
+import records as rec
+import sample_log as slog
+import board_setup as bset
+import background_loop as bgl
+from instrumentation import timer
+
+# Importing self made modules. Plotting is only imported once a graph is asked for.
 import temp_pin_func as tpf
 import sevseg
 import Polling_Loop as ploop
 import services_menu as serv
+timer.record('imports',time.perf_counter()-startTime)
+
+
+def main():
+    """
+    Function that runs the HVAC system: connects to the board, loads the history and runs the menus.
+    Only runs when this file is run, not when it's imported, e.g. by the analytics worker processes.
+    """
+    # Connecting to the board in the background, so the PIN can be set during the handshake
+    simulate = '--simulate' in sys.argv
+    boardReady = bset.connect_in_background(simulate)
+    if simulate:
+        # Kept apart from the real log so simulated samples never end up in it
+        logPath = slog.logPath.replace('.bin','_simulated.bin')
+    else:
+        logPath = slog.logPath
+
+    # Set up initial variables
+    settings = rec.Settings(tempLow=18, tempHigh=20, ventSpeed=1)
+    rollupPath = hist.rollup_path(logPath)
+    with timer.stage('history load'):
+        state = rec.ControlState(currentTemp=0, currentLight=0, history=hist.SensorHistory(), log=slog.SampleLog(logPath))
+        # Rollups of everything logged before, so plots can go back further than this session.
+        # The ones saved last time are carried on, so only what's been logged since is worked through.
+        state.history.restore(state.log,rollupPath)
+
+    # Only measure how long it takes to get ready to control, e.g. after changing what's imported
+    if '--startup-time' in sys.argv:
+        bset.wait_for(boardReady)
+        timer.record('startup',time.perf_counter()-startTime)
+        print("Startup timings (ms)")
+        print(timer.report())
+        bset.shutdown(boardReady)
+        return
+
+    # Run the program. The control loop is made once the board is needed.
+    pin = tpf.set_pin()
+    control = None
+    while True:
+        try:
+            menu = serv.main_menu()
+            if menu == 1:
+                if control is None:
+                    board = bset.wait_for(boardReady)
+                    if board is None:
+                        continue
+                    control = bgl.ControlWorker(board)
+                state = serv.turn_on_off(state,settings,control)
+            elif menu == 2:
+                # Only the settings change, so this doesn't wait for the board
+                settings = serv.maintenance(pin,settings)
+                # A running loop picks the new settings up on its next cycle
+                if control is not None:
+                    control.update_settings(settings)
+            elif menu == 3:
+                serv.data_observation(state,settings)
+            elif menu == 4:
+                serv.loop_timings()
+            elif menu == 5:
+                print("\nTerminating program...")
+                if control is not None:
+                    control.stop()
+                state.log.flush()
+                state.history.save_rollups(rollupPath)
+                break
+        except KeyboardInterrupt:
+            pass
+    bset.shutdown(boardReady)
+
 
-# Run the program
-pin = tpf.set_pin()
-while True:
-    try:
-        menu = serv.main_menu()
-        if menu == 1:
-            dataset = serv.turn_on_off(dataset,settings,board)
-        elif menu == 2:
-            settings = serv.maintenance(pin,settings,board)
-        elif menu == 3:
-            serv.data_observation(dataset)
-        elif menu == 4:
-            print("\nTerminating program...")
-            break
-    except KeyboardInterrupt:
-        pass
-board.shutdown()
\ No newline at end of file
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,143 @@
+"""
+Plot Export file
+Created by: Team D09
+Version: 1
+Last modified: 18/10/2026
+
+Draws the temperature, gradient and light history into one image without needing a display.
+    python plot_export.py --output snapshot.png              one snapshot of the sample log, e.g. from cron
+    python plot_export.py --output snapshot.png --every 60   keep redrawing it every minute
+"""
+
+import sys
+import time
+import argparse
+import numpy as np
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+import history as hist
+import sample_log as slog
+figureSize = (8,9)
+dpi = 100
+panels = (('temp',"Temperature (C)"),('grad',"Change in temperature (C/s)"),('light',"Light Intensity (Lux)"))
+
+# Made on the first export and reused after that
+snapshot = None
+
+
+class SnapshotFigure:
+    """
+    Class that keeps one figure with a panel for each of temperature, gradient and light.
+    The figure and its lines are only made once, every snapshot after that just swaps the
+    data in the lines. It draws with Agg straight to a file, so no GUI backend is used.
+
+    Args:
+        figureSize (Tuple): Width and height in inches
+        dpi (Integer): Pixels per inch
+    """
+    def __init__(self,figureSize=figureSize,dpi=dpi):
+        self.figure = Figure(figsize=figureSize,dpi=dpi,layout='constrained')
+        self.canvas = FigureCanvasAgg(self.figure)
+        axes = self.figure.subplots(len(panels),1,sharex=True)
+        self.axes = {}
+        self.lines = {}
+        for ax, (column, label) in zip(axes,panels):
+            ax.set_ylabel(label)
+            # Min and max are thin lines either side of the mean so they can be updated in place
+            low, = ax.plot([],[],color='C0',linewidth=0.5,alpha=0.4)
+            high, = ax.plot([],[],color='C0',linewidth=0.5,alpha=0.4)
+            mean, = ax.plot([],[],color='C0')
+            self.axes[column] = ax
+            self.lines[column] = (low,high,mean)
+        axes[-1].set_xlabel("Time (s)")
+        self.title = self.figure.suptitle("")
+
+    def update(self,history):
+        """
+        Function that puts the newest history into the lines, at whichever resolution fills the plot.
+
+        Args:
+            history (SensorHistory): The sensor history
+        """
+        data = {column: history.plot_data(column) for column, label in panels}
+        starts = [values['time'][0] for values in data.values() if len(values['time'])]
+        origin = min(starts) if starts else 0
+        for column, (low, high, mean) in self.lines.items():
+            timeData = data[column]['time'] - origin
+            low.set_data(timeData,data[column]['min'])
+            high.set_data(timeData,data[column]['max'])
+            mean.set_data(timeData,data[column]['mean'])
+            self.axes[column].relim()
+            self.axes[column].autoscale_view()
+        if starts:
+            self.title.set_text("Sensor data from " + time.strftime("%d/%m/%Y %H:%M:%S",time.localtime(origin)))
+
+    def save(self,path):
+        """
+        Function that renders the figure to a PNG.
+
+        Args:
+            path (String): File to write to
+        """
+        self.figure.savefig(path)
+
+
+def export(history,path):
+    """
+    Function that draws the history into a single multi-panel image, reusing the same figure every time.
+
+    Args:
+        history (SensorHistory): The sensor history
+        path (String): File to write to
+    """
+    global snapshot
+    if snapshot is None:
+        snapshot = SnapshotFigure()
+    snapshot.update(history)
+    snapshot.save(path)
+
+
+def load_history(log):
+    """
+    Function that builds a sensor history from a sample log, carrying on from the rollups
+    the controller saved so only what's been logged since has to be worked through.
+
+    Args:
+        log (SampleLog): The sample log
+
+    Returns:
+        history (SensorHistory): Rollups of the logged samples
+        lastTime (Float): When the newest logged sample was taken, None if the log is empty
+    """
+    history = hist.SensorHistory()
+    return history, history.restore(log,hist.rollup_path(log.path))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Draw the logged sensor history to a PNG without a display")
+    parser.add_argument('--log',default=slog.logPath,help="sample log to read")
+    parser.add_argument('--output',default="SensorData.png",help="image to write")
+    parser.add_argument('--every',type=float,metavar='SECONDS',help="keep redrawing the image this often")
+    args = parser.parse_args(argv)
+
+    log = slog.SampleLog(args.log,readOnly=True)
+    history, lastTime = load_history(log)
+    export(history,args.output)
+    print(f"Saved to {args.output}")
+    try:
+        while args.every:
+            time.sleep(args.every)
+            # Only the samples logged since the last snapshot need adding
+            records = log.read(since=np.nextafter(lastTime,np.inf) if lastTime is not None else None)
+            for sample in records:
+                history.append(float(sample['time']),float(sample['temp']),float(sample['light']))
+            if len(records):
+                lastTime = float(records['time'][-1])
+            export(history,args.output)
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
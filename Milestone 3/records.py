@@ -0,0 +1,44 @@
+"""
+Control State records file
+Created by: Team D09
+Version: 1
+Last modified: 18/10/2026
+"""
+
+from dataclasses import dataclass, field
+import history as hist
+import sample_log as slog
+
+
+@dataclass(slots=True)
+class Settings:
+    """
+    Record of the settings set by the user.
+
+    Args:
+        tempLow (Integer): The lower bound of the temperature range
+        tempHigh (Integer): The upper bound of the temperature range
+        ventSpeed (Integer): The speed of the fan, 1 for low and 2 for high
+    """
+    tempLow: int = 18
+    tempHigh: int = 20
+    ventSpeed: int = 1
+
+
+@dataclass(slots=True)
+class ControlState:
+    """
+    Record of the state of the control loop.
+
+    Args:
+        currentTemp (Float): The newest temperature from the thermistor, to a tenth of a degree
+        currentLight (Float): The newest lux from the LDR
+        history (SensorHistory): Every sample taken so far, stored column by column
+        outputKey (Tuple): The output state the LEDs are showing, None before the first decision
+        log (SampleLog): Where every sample is saved to disk, None to not save them
+    """
+    currentTemp: float = 0.0
+    currentLight: float = 0.0
+    history: hist.SensorHistory = field(default_factory=hist.SensorHistory)
+    outputKey: tuple = None
+    log: slog.SampleLog = None
@@ -0,0 +1,103 @@
+"""
+Sample Log function file
+Created by: Team D09
+Version: 1
+Last modified: 18/10/2026
+"""
+
+import os
+import numpy as np
+logPath = os.path.join(os.path.dirname(os.path.abspath(__file__)),'sensor_log.bin')
+batchSize = 64
+magic = b'HVACLOG1'
+
+# One fixed-width record per sample, little-endian so the file reads the same on any machine
+recordType = np.dtype([('time','<f8'),('rawTemp','<u2'),('rawLight','<u2'),('temp','<f4'),('light','<f4')])
+headerSize = 16
+
+
+class SampleLog:
+    """
+    Class that keeps every sample in an append-only binary file, so the history
+    survives the program closing. Samples are written in batches, and reading maps the
+    file straight into a NumPy array instead of parsing it.
+
+    Args:
+        path (String): The log file. Made if it doesn't exist.
+        batchSize (Integer): How many samples are held in memory before being written
+        readOnly (Boolean): Only read the log, e.g. while the controller is still writing it.
+            The file has to exist and is never changed.
+    """
+    def __init__(self,path=logPath,batchSize=batchSize,readOnly=False):
+        self.path = path
+        self.batchSize = batchSize
+        self._buffer = np.zeros(batchSize,dtype=recordType)
+        self._buffered = 0
+        if readOnly or (os.path.exists(path) and os.path.getsize(path) >= headerSize):
+            with open(path,'rb') as file:
+                header = file.read(headerSize)
+            if header[:8] != magic or int.from_bytes(header[8:],'little') != recordType.itemsize:
+                raise ValueError(f"{path} is not a sample log this version can read")
+            if not readOnly:
+                self._trim()
+        else:
+            with open(path,'wb') as file:
+                file.write(magic + recordType.itemsize.to_bytes(8,'little'))
+
+    def _trim(self):
+        # A sample cut off part way through being written (e.g. power lost) would shift
+        # every sample after it, so it's dropped
+        size = os.path.getsize(self.path)
+        whole = headerSize + (size-headerSize)//recordType.itemsize*recordType.itemsize
+        if whole != size:
+            os.truncate(self.path,whole)
+
+    def __len__(self):
+        stored = (os.path.getsize(self.path)-headerSize)//recordType.itemsize
+        return stored + self._buffered
+
+    def append(self,timeStamp,rawTemp,rawLight,temp,light):
+        """
+        Function that adds a sample, writing the batch to the file once it's full.
+
+        Args:
+            timeStamp (Float): When the sample was taken in seconds since the epoch
+            rawTemp (Integer): The 10-bit thermistor reading
+            rawLight (Integer): The 10-bit LDR reading
+            temp (Float): Temperature in degrees C
+            light (Float): Light intensity in lux
+        """
+        self._buffer[self._buffered] = (timeStamp,rawTemp,rawLight,temp,light)
+        self._buffered += 1
+        if self._buffered == self.batchSize:
+            self.flush()
+
+    def flush(self):
+        """
+        Function that writes every sample still held in memory to the file.
+        """
+        if self._buffered:
+            with open(self.path,'ab') as file:
+                file.write(self._buffer[:self._buffered].tobytes())
+            self._buffered = 0
+
+    def read(self,since=None,until=None):
+        """
+        Function that maps the logged samples into memory without copying or parsing them.
+        Samples are in time order, so a time range is found with a binary search.
+
+        Args:
+            since (Float): Only give samples taken at or after this time. Defaults to the first sample.
+            until (Float): Only give samples taken before this time. Defaults to the last sample.
+
+        Returns:
+            records (numpy.ndarray): Read-only records with the fields 'time', 'rawTemp', 'rawLight', 'temp' and 'light'
+        """
+        self.flush()
+        count = (os.path.getsize(self.path)-headerSize)//recordType.itemsize
+        if count == 0:
+            return np.zeros(0,dtype=recordType)
+        records = np.memmap(self.path,dtype=recordType,mode='r',offset=headerSize,shape=(count,))
+        start = 0 if since is None else np.searchsorted(records['time'],since,'left')
+        end = count if until is None else np.searchsorted(records['time'],until,'left')
+        return records[start:end]
@@ -0,0 +1,253 @@
+"""
+Analog Sensor function file
+Created by: Team D09
+Version: 1
+Last modified: 18/10/2026
+"""
+
+import bisect
+import weakref
+import threading
+from collections import deque
+thermIn = 0
+lightIn = 1
+# The filters need every report. Pymata4 applies the differential on the computer, so it never saved serial traffic.
+differential = 0
+# Instead, waiting for a change only wakes up once a filtered reading moves by more than this, in 10-bit steps
+deadband = 0.5
+bufferSize = 256
+oversampling = 4
+medianSize = 3
+smoothing = 0.5
+# Longest time between reports while filtering, so the filters don't lag far behind the room
+maxReportInterval = 0.1
+idleTime = 10
+# Firmata's own sampling interval, and the range it accepts
+samplingInterval = 0.019
+intervalRange = (0.01,16.383)
+
+# Sensors already set up, one per board. Forgotten once a board is gone.
+attached = weakref.WeakKeyDictionary()
+
+
+class SampleBuffer:
+    """
+    Class that keeps the last few samples of an analog pin in a fixed size ring buffer,
+    each with the time the board reported it.
+
+    Args:
+        size (Integer): How many samples are kept
+    """
+    def __init__(self,size=bufferSize):
+        self.size = size
+        self.values = [0]*size
+        self.times = [0.0]*size
+        self.count = 0
+
+    def append(self,value,timeStamp):
+        """
+        Function that stores a sample, overwriting the oldest one once the buffer is full.
+
+        Args:
+            value (Integer): The 10-bit analog reading
+            timeStamp (Float): When the reading arrived
+        """
+        index = self.count % self.size
+        self.values[index] = value
+        self.times[index] = timeStamp
+        self.count += 1
+
+    def latest(self):
+        """
+        Function that gives the newest sample.
+
+        Returns:
+            sample (List): The newest [value, time stamp], or [0, 0] if nothing has arrived yet
+        """
+        if self.count == 0:
+            return [0,0.0]
+        index = (self.count-1) % self.size
+        return [self.values[index],self.times[index]]
+
+    def samples(self):
+        """
+        Function that gives every stored sample, oldest first.
+
+        Returns:
+            samples (List): List of (time stamp, value) pairs
+        """
+        stored = min(self.count,self.size)
+        first = self.count - stored
+        return [(self.times[i % self.size],self.values[i % self.size]) for i in range(first,self.count)]
+
+
+class SampleFilter:
+    """
+    Class that cleans up the readings of one analog pin before they're converted and stored.
+    Readings are averaged in groups (oversampling), each average goes through a running median,
+    which throws out single spikes, and then an exponential moving average, which smooths what's left.
+    Each reading costs the same however long the filter runs.
+
+    Args:
+        oversampling (Integer): How many readings are averaged into each filtered one. 1 turns it off.
+        medianSize (Integer): How many averages the median is taken over. 1 turns it off.
+        smoothing (Float): Weight of the newest value in the moving average, between 0 and 1. 1 turns it off.
+    """
+    def __init__(self,oversampling=oversampling,medianSize=medianSize,smoothing=smoothing):
+        self.oversampling = oversampling
+        self.medianSize = medianSize
+        self.smoothing = smoothing
+        self.value = None
+        self._total = 0
+        self._summed = 0
+        self._window = deque()
+        self._sorted = []
+
+    def add(self,raw):
+        """
+        Function that adds a raw reading.
+
+        Args:
+            raw (Integer): The 10-bit analog reading
+
+        Returns:
+            value (Float): The new filtered reading, or None if the reading only went into an unfinished group
+        """
+        self._total += raw
+        self._summed += 1
+        if self._summed < self.oversampling:
+            return None
+        average = self._total/self._summed
+        self._total = self._summed = 0
+
+        # The window is kept sorted as well, so the median is just the middle of it
+        if len(self._window) == self.medianSize:
+            del self._sorted[bisect.bisect_left(self._sorted,self._window.popleft())]
+        self._window.append(average)
+        bisect.insort(self._sorted,average)
+        n = len(self._sorted)
+        median = (self._sorted[(n-1)//2] + self._sorted[n//2])/2
+
+        if self.value is None:
+            self.value = median
+        else:
+            self.value += self.smoothing*(median-self.value)
+        return self.value
+
+
+class AnalogSensors:
+    """
+    Class that receives analog reports from the board through callbacks instead of polling.
+    Every report goes through a filter, and waiting for a change waits for a filtered reading
+    that has moved by more than the deadband.
+
+    Args:
+        board: The Arduino
+        pins (List): Analog pin numbers to report
+        differential (Integer): Smallest change in the reading that is reported
+        size (Integer): How many samples are kept for each pin
+        oversampling (Integer): How many reports are averaged into each filtered reading
+        medianSize (Integer): How many averages the median is taken over
+        smoothing (Float): Weight of the newest value in the moving average, between 0 and 1
+        deadband (Float): How far a filtered reading has to move from the last one waited for to count as a change
+    """
+    def __init__(self,board,pins=(thermIn,lightIn),differential=differential,size=bufferSize,oversampling=oversampling,medianSize=medianSize,smoothing=smoothing,deadband=deadband):
+        self.buffers = {pin: SampleBuffer(size) for pin in pins}
+        self.filters = {pin: SampleFilter(oversampling,medianSize,smoothing) for pin in pins}
+        self.filtered = {pin: SampleBuffer(size) for pin in pins}
+        self.oversampling = oversampling
+        self.deadband = deadband
+        self._notified = {pin: None for pin in pins}
+        self.sequence = 0
+        self._changed = threading.Condition()
+        for pin in pins:
+            board.set_pin_mode_analog_input(pin,callback=self._callback,differential=differential)
+
+    def _callback(self,data):
+        pinType, pin, value, timeStamp = data[:4]
+        with self._changed:
+            self.buffers[pin].append(value,timeStamp)
+            filtered = self.filters[pin].add(value)
+            if filtered is not None:
+                self.filtered[pin].append(filtered,timeStamp)
+                # Every filtered reading is kept, but only one that has really moved wakes anything up
+                last = self._notified[pin]
+                if last is None or abs(filtered-last) > self.deadband:
+                    self._notified[pin] = filtered
+                    self.sequence += 1
+                    self._changed.notify_all()
+
+    def analog_read(self,pin):
+        """
+        Function that gives the newest reading of a pin, the same way board.analog_read does.
+
+        Args:
+            pin (Integer): Analog pin number
+
+        Returns:
+            sample (List): The newest [value, time stamp]
+        """
+        with self._changed:
+            return self.buffers[pin].latest()
+
+    def filtered_read(self,pin):
+        """
+        Function that gives the newest filtered reading of a pin.
+
+        Args:
+            pin (Integer): Analog pin number
+
+        Returns:
+            sample (List): The newest [value, time stamp], where the value is a fractional 10-bit reading
+        """
+        with self._changed:
+            return self.filtered[pin].latest()
+
+    def wait_for_change(self,sequence,timeout=idleTime):
+        """
+        Function that waits until a filtered reading moves by more than the deadband after the given sequence number.
+
+        Args:
+            sequence (Integer): The sequence number seen last
+            timeout (Float): Longest time to wait in seconds
+
+        Returns:
+            sequence (Integer): The newest sequence number
+        """
+        with self._changed:
+            self._changed.wait_for(lambda: self.sequence != sequence,timeout)
+            return self.sequence
+
+
+def attach(board,pins=(thermIn,lightIn),differential=differential,oversampling=oversampling,medianSize=medianSize,smoothing=smoothing,deadband=deadband):
+    """
+    Function that sets up the analog sensors of a board, or gives the ones already set up.
+
+    Args:
+        board: The Arduino
+        pins (List): Analog pin numbers to report
+        differential (Integer): Smallest change in the reading that is reported
+        oversampling (Integer): How many reports are averaged into each filtered reading
+        medianSize (Integer): How many averages the median is taken over
+        smoothing (Float): Weight of the newest value in the moving average, between 0 and 1
+        deadband (Float): How far a filtered reading has to move to count as a change
+
+    Returns:
+        sensors (AnalogSensors): The sensors of the board
+    """
+    if board not in attached:
+        attached[board] = AnalogSensors(board,pins,differential,bufferSize,oversampling,medianSize,smoothing,deadband)
+    return attached[board]
+
+
+def set_sampling_interval(board,interval=samplingInterval):
+    """
+    Function that sets how often the board reads its analog pins and reports them.
+    Firmata sends every analog pin each interval, so a longer one means less serial traffic.
+
+    Args:
+        board: The Arduino
+        interval (Float): Time between reports in seconds. Defaults to Firmata's own.
+    """
+    low, high = intervalRange
+    board.set_sampling_interval(round(min(max(interval,low),high)*1000))
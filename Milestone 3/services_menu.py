@@ -5,14 +5,18 @@ Version: 3
 Last modified: 13/10/2023
 """
 
-import matplotlib.pyplot as plt
 import math
 import time
 import temp_pin_func as tpf
 import sevseg
-import Polling_Loop as ploop
+import async_loop as aloop
+import analytics as anl
+from instrumentation import timer
 timeLimit = 60
 
+# Started the first time analytics are asked for
+worker = None
+
 def main_menu():
     """
     The function that shows the main menu
@@ -26,12 +30,13 @@ def main_menu():
             print("\n1. Turn on/off")
             print("2. Maintenance mode")
             print("3. Data obsevation")
-            print("4. Terminate the program")
+            print("4. Loop timings")
+            print("5. Terminate the program")
             print("--------------------")
             option = int(input("Please pick one of the option: "))
                 
             # Check if input is valid
-            if option>0 and option<=4:
+            if option>0 and option<=5:
                 return option
             else:
                 print("Please only input from the menu available\n")
@@ -40,34 +45,47 @@ def main_menu():
         except KeyboardInterrupt:
             print("\nPlease only input from the menu available\n")
         
-def turn_on_off(dataset,settings,board):
+def turn_on_off(state,settings,control):
     """
     Function that shows the first part of the services subsystem.
-    Place to turn the system on.
+    Place to turn the system on. The system keeps running in the background after going back to the menu.
 
     Args:
-        dataset (List): List of data needed consisting of temperature, light, change in temperature, and time
-        settings (List): List of the settings set by the user. This consists of the upper and lower bound of the temperature and fan speed
-        board: The Arduino
+        state (ControlState): The current temperature, the current light and the sensor history
+        settings (Settings): The settings set by the user. This consists of the upper and lower bound of the temperature and fan speed
+        control (ControlWorker): Runs the polling loop in the background
         
     Returns:
-        dataset (List): List of data needed consisting of temperature, light, change in temperature, and time
+        state (ControlState): The current temperature, the current light and the sensor history
     """
     while True:
             try:
                 # Shows the main menu
+                print(f"System is currently {'on' if control.is_running() else 'off'}")
+                if control.error is not None:
+                    print(f"It stopped because of an error: {control.error!r}")
                 print("1. Turn on system")
                 print("2. Turn off system")
+                print("3. Turn on system (async engine)")
                 print("Ctrl + C to return to main menu")
                 print("--------------------")
                 turnOnOffChoice = int(input("Please pick one of the option: "))
                     
                 # Check if input is valid
-                if turnOnOffChoice > 0 and turnOnOffChoice <= 2:
+                if turnOnOffChoice > 0 and turnOnOffChoice <= 3:
                     if turnOnOffChoice == 1:
-                        dataset = ploop.polling_loop(dataset,settings,board)
+                        control.start(state,settings)
+                        print("System is on, it keeps running while the menus are in use")
+                        return state
                     elif turnOnOffChoice == 2:
-                        continue
+                        if control.is_running():
+                            state = control.stop()
+                            print("System is off")
+                    elif turnOnOffChoice == 3:
+                        # The async engine runs in the foreground, so the background loop is stopped first
+                        if control.is_running():
+                            state = control.stop()
+                        state = aloop.polling_loop(state,settings,control.board)
                 else:
                     print("Please only input from the menu available\n")
                     continue
@@ -75,32 +93,29 @@ def turn_on_off(dataset,settings,board):
             except ValueError:
                 print("Please only input from the menu available\n")
             except KeyboardInterrupt:
-                return dataset
+                return state
     
-def maintenance(pin, settings, board, timeLimit=timeLimit):
+def maintenance(pin, settings, board=None, timeLimit=timeLimit):
     """
     Function that shows the maintenance part of the services subsystem.
 
     Args:
         pin (Integer): Variable containing pin
-        settings (List): List of the settings set by the user. This consists of the upper and lower bound of the temperature and fan speed
-        board: The Arduino
+        settings (Settings): The settings set by the user. This consists of the upper and lower bound of the temperature and fan speed
+        board: The Arduino. Not needed, since only the settings are changed.
         timeLimit (Integer): The time limit for how long the user can stay. Defaults to timeLimit.
         
     Returns:
-        settings (List): List of the settings set by the user. This consists of the upper and lower bound of the temperature and fan speed
+        settings (Settings): The settings set by the user. This consists of the upper and lower bound of the temperature and fan speed
     """
     # Ask for pin
     tpf.check_pin(pin)    
-    lowBoundOld = settings[0]
-    upBoundOld = settings [1]
-    ventSpeedOld = settings[2]
     
     while True:
         try:
             # Show the options
-            print(f"Current temperature range is between {lowBoundOld} and {upBoundOld}")
-            print(f"Current ventilation speed: {ventSpeedOld}")
+            print(f"Current temperature range is between {settings.tempLow} and {settings.tempHigh}")
+            print(f"Current ventilation speed: {settings.ventSpeed}")
             print("--------------------------")
             print("What would you like to do")
             print("1. Change the temperature range")
@@ -114,7 +129,7 @@ def maintenance(pin, settings, board, timeLimit=timeLimit):
             # Checks if the user is still within the limit
             if end-start>timeLimit:
                 print("Took too long to answer, please login again")
-                return [lowBoundOld,upBoundOld,ventSpeedOld]
+                return settings
             
             # Temperature options
             elif maintenanceOpt == 1:
@@ -132,17 +147,19 @@ def maintenance(pin, settings, board, timeLimit=timeLimit):
                         end = time.time()
                         if end-start>timeLimit:
                             print("Took too long to answer, please login again")
-                            return [lowBoundOld,upBoundOld,ventSpeedOld]
+                            return settings
                         elif lowBoundNew>upBoundNew:
                             print("Upper and Lower bound might have been mismatched, please try again")
                         elif (lowBoundNew<=5) and (upBoundNew>=30):
                             print("Please only input values between 5 and 30")
                         else:
-                            return [lowBoundNew,upBoundNew,ventSpeedOld]
+                            settings.tempLow = lowBoundNew
+                            settings.tempHigh = upBoundNew
+                            return settings
                     except ValueError:
                         print("Please only input numbers")
                     except KeyboardInterrupt:
-                        return [lowBoundOld,upBoundOld,ventSpeedOld]
+                        return settings
             
             # Fanspeed options
             elif maintenanceOpt == 2:
@@ -161,15 +178,16 @@ def maintenance(pin, settings, board, timeLimit=timeLimit):
                         # Checks if the user is still within the limit
                         if end-start>timeLimit:
                             print("Took too long to answer, please login again")
-                            return [lowBoundOld,upBoundOld,ventSpeedOld] 
-                        elif (settings[2] == 1) or (settings[2] == 2):
-                            return [lowBoundOld,upBoundOld,ventSpeedNew]
+                            return settings
+                        elif (ventSpeedNew == 1) or (ventSpeedNew == 2):
+                            settings.ventSpeed = ventSpeedNew
+                            return settings
                         else:
                             print("Please only input 1 or 2")
                     except ValueError:
                         print("Please only input numbers")
                     except KeyboardInterrupt:
-                        return [lowBoundOld,upBoundOld,ventSpeedOld]
+                        return settings
                     
             else:
                 print("Please only input from the menu available\n")
@@ -178,21 +196,64 @@ def maintenance(pin, settings, board, timeLimit=timeLimit):
         except ValueError:
             print("Please only input from the menu available\n")
         except KeyboardInterrupt:
-            return [lowBoundOld,upBoundOld,ventSpeedOld]
+            return settings
     
-def data_observation(dataset):
+def plot_history(data):
+    """
+    Function that plots data from the sensor history, with the range of each point shaded
+    when the points are rollups of many samples.
+
+    Args:
+        data (Dictionary): 'time', 'min', 'max' and 'mean' arrays from SensorHistory.plot_data
+    """
+    import matplotlib.pyplot as plt
+    timeData = data['time']
+    if len(timeData) > 0:
+        timeData = timeData - timeData[0]
+    if data['min'] is not data['max']:
+        plt.fill_between(timeData, data['min'], data['max'], alpha=0.3)
+    plt.plot(timeData, data['mean'])
+
+
+def show_analytics(state,settings):
+    """
+    Function that analyses the whole sensor history in a worker process and shows the summary.
+
+    Args:
+        state (ControlState): The current temperature, the current light and the sensor history
+        settings (Settings): The settings set by the user, for the comfortable temperature range
+    """
+    global worker
+    if worker is None:
+        worker = anl.AnalyticsWorker()
+    print("Analysing...")
+    summary = worker.submit(state.history,settings).result()
+    if summary['samples'] < 2:
+        print("Not enough data to analyse")
+        return
+    print(f"Samples: {summary['samples']}")
+    print(f"Temperature: mean {summary['tempMean']:.2f} C, range {summary['tempMin']:.2f} to {summary['tempMax']:.2f} C")
+    print(f"Light: mean {summary['lightMean']:.2f} lux, range {summary['lightMin']:.2f} to {summary['lightMax']:.2f} lux")
+    if 'steepestSlope' in summary:
+        print(f"Steepest change in temperature: {summary['steepestSlope']:.3f} C/s")
+    print(f"Unusual readings: {summary['anomalies']}")
+    if 'comfortable' in summary:
+        print(f"Time in range: {summary['comfortable']*100:.1f}%, too cold {summary['tooCold']*100:.1f}%, too hot {summary['tooHot']*100:.1f}%")
+
+
+def data_observation(state,settings):
     """
     Function that shows the data observation part of the services subsystem.
 
     Args:
-        dataset (List): List of data needed consisting of temperature, light, change in temperature, and time
+        state (ControlState): The current temperature, the current light and the sensor history
+        settings (Settings): The settings set by the user. This consists of the upper and lower bound of the temperature and fan speed
     """
-    # Get the data from the dataset
-    tempData = dataset[1]
-    gradData = dataset[2]
-    lightData = dataset[4]
-    timeData = dataset[5]
-    
+    # Plotting takes most of a second to import, so it's only imported once it's needed
+    import matplotlib.pyplot as plt
+    import plot_export as pexp
+
+    history = state.history
     while True:
         try:
             # Show the options
@@ -200,18 +261,31 @@ def data_observation(dataset):
             print("1. Temperature graph")
             print("2. Change in temperature graph")
             print("3. Light graph")
+            print("4. Save every graph to one image")
+            print("5. Analyse the history")
             print("Ctrl+C to return to main menu")
             print("--------------------")
 
             dataOpt = int(input("Please pick one of the option: "))
+            if dataOpt == 4:
+                # Drawn off screen, so the menu doesn't wait on a plot window
+                name = time.strftime("%d%m%Y%H%M%S", time.localtime()) + " SensorData.png"
+                pexp.export(history, name)
+                print(f"Saved to {name}")
+                continue
+            elif dataOpt == 5:
+                show_analytics(state, settings)
+                continue
             saveOpt = input("Do you want to save the data(y/n): ")
-            # Graphing
+            # Graphing. The data is fetched for each graph, at whichever resolution fills the plot,
+            # since the loop can still be sampling in the background.
             if dataOpt == 1:
-                if len(tempData) < 20:
+                tempData = history.plot_data('temp')
+                if len(tempData['time']) < 20:
                     print("Not enough data to plot")
-                    print(len(tempData))
+                    print(len(tempData['time']))
                 elif saveOpt == 'y':
-                    plt.plot(timeData, tempData)
+                    plot_history(tempData)
                     plt.title("Temperature vs Time")
                     plt.xlabel("Time (s)")
                     plt.ylabel("Temperature (C)")
@@ -219,16 +293,17 @@ def data_observation(dataset):
                     plt.savefig(str(name))
                     plt.show()
                 else:
-                    plt.plot(timeData, tempData)
+                    plot_history(tempData)
                     plt.title("Temperature vs Time")
                     plt.xlabel("Time (s)")
                     plt.ylabel("Temperature (C)")
                     plt.show()
             elif dataOpt == 2:
-                if len(gradData) < 10:
+                gradData = history.plot_data('grad')
+                if len(gradData['time']) < 10:
                     print("Not enough data to plot")
                 elif saveOpt == 'y':
-                    plt.plot(timeData[0:9], gradData[0:9])
+                    plot_history(gradData)
                     plt.title("Change in Temperature vs Time")
                     plt.xlabel("Time (s)")
                     plt.ylabel("Change in temperature (C)")
@@ -236,16 +311,17 @@ def data_observation(dataset):
                     plt.savefig(str(name))
                     plt.show()
                 else:
-                    plt.plot(timeData[0:9], gradData[0:9])
+                    plot_history(gradData)
                     plt.title("Change in Temperature vs Time")
                     plt.xlabel("Time (s)")
                     plt.ylabel("Change in temperature (C)")
                     plt.show()
             elif dataOpt == 3:
-                if len(lightData)<20:
+                lightData = history.plot_data('light')
+                if len(lightData['time'])<20:
                     print("Not enough data to plot")
                 elif saveOpt == 'y':
-                    plt.plot(timeData, lightData)
+                    plot_history(lightData)
                     plt.title("Light Intensity vs Time")
                     plt.xlabel("Time (s)")
                     plt.ylabel("Light Intensity (Lux)")
@@ -253,15 +329,32 @@ def data_observation(dataset):
                     plt.savefig(str(name))
                     plt.show()
                 else:
-                    plt.plot(timeData, lightData)
+                    plot_history(lightData)
                     plt.title("Light Intensity vs Time")
                     plt.xlabel("Time (s)")
                     plt.ylabel("Light Intensity (Lux)")
                     plt.show()
             else:
-                print("Please only input whole numbers between 1 and 3")
+                print("Please only input whole numbers between 1 and 5")
         except KeyboardInterrupt:
             break
         except ValueError:
-            print("Please only input whole numbers between 1 and 3")
+            print("Please only input whole numbers between 1 and 5")
+
 
+def loop_timings():
+    """
+    Function that shows how long each stage of the control loop has been taking,
+    with the option to save it to a file.
+    """
+    print("\nLoop stage timings (ms)")
+    print(timer.report())
+    print("--------------------")
+    try:
+        saveOpt = input("Do you want to save the timings(y/n): ")
+        if saveOpt == 'y':
+            name = time.strftime("%d%m%Y%H%M%S", time.localtime()) + " LoopTimings.txt"
+            timer.dump(name)
+            print(f"Saved to {name}")
+    except KeyboardInterrupt:
+        pass
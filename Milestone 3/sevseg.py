@@ -6,26 +6,16 @@ Last modified: 13/10/2023
 """
 
 import time
+import functools
+import threading
+import shift_register as shreg
+import timers
+from instrumentation import timer
 serialPinSevseg = 7
 rclckPinSevseg = 8
 srclckPinSevseg = 9
 onPins = [10,11,12,13]
-
-def write_sevseg(msg,duration,board,onPins=onPins,serialPin=serialPinSevseg,rclckPin=rclckPinSevseg,srclckPin=srclckPinSevseg):
-    """
-    Function that shows a message on the seven segment display.
-
-
-    Args:
-        msg: Message on what wants to be written
-        duration (Integer): How long you want the message to last
-        board: The Arduino
-        onPins (List): Pins to turn on/off the digits of the seven segment display
-        serialPin (Integer): Digital pin number for the shift register's serial pin.
-        rclckPin (Integer): Digital pin number for the shift register's register clock pin.
-        srclckPin (Integer): Digital pin number for the shift register's serial clock pin..
-    """
-    lookupDictionary = {
+lookupDictionary = {
     "0": "01111110",
     "1": "00110000",
     "2": "01101101",
@@ -63,73 +53,142 @@ def write_sevseg(msg,duration,board,onPins=onPins,serialPin=serialPinSevseg,rclc
     'Z': '01101001',
     ' ': '00000000',
     '*': '01100011'}
-    
-    for k in range(8):
-        board.digital_pin_write(serialPin,0)
-        board.digital_pin_write(srclckPin,1)
-        time.sleep(0.0001)
-        board.digital_pin_write(srclckPin,0)
-    board.digital_pin_write(rclckPin,1)
-    time.sleep(0.0001)
-    board.digital_pin_write(rclckPin,0)
-    
-    msg = str(msg)
-    values = []
-    for m in range(len(msg)):
-        values.append(msg[m])
-    
-    for k in range(len(msg)):
-        try:
-            values[k] = int(values[k])
-        except ValueError:
-            values[k] = values[k].upper()
-
-    for j in range(len(values)):
-        values[j] = lookupDictionary[str(values[j])]
-
-    start = time.time()
-    counter = 0
-    while counter<=duration:
-        
-        if len(values)<=4:
-            while len(values)!=4:
-                values.append(lookupDictionary[' '])
-
-            for i in range(len(values)):
-                for j in range(len(values[i])):
-                    board.digital_pin_write(serialPin,int(values[i][j]))
-                    board.digital_pin_write(srclckPin,1)
-                    time.sleep(0.0001)
-                    board.digital_pin_write(srclckPin,0)
-                board.digital_pin_write(rclckPin,1)
-                board.digital_pin_write(onPins[i],0)
-                time.sleep(0.0001)
-                board.digital_pin_write(onPins[i],1)
-                board.digital_pin_write(rclckPin,0)
-
-        else:
-            for l in range(len(msg)):
-                temp = []
-                for s in range(4):
-                    if s+l<len(values):
-                        temp.append(values[s+l])
-                while len(temp)<4:
-                    temp.append(lookupDictionary[' '])
-                
-                start2 = time.time()
-                counter2 = 0
-                while counter2<0.2:
-                    for o in range(len(temp)):
-                        for p in range(len(temp[o])):
-                            board.digital_pin_write(serialPin,int(temp[o][p]))
-                            board.digital_pin_write(srclckPin,1)
-                            time.sleep(0.0001)
-                            board.digital_pin_write(srclckPin,0)
-                        board.digital_pin_write(rclckPin,1)
-                        board.digital_pin_write(onPins[o],0)
-                        time.sleep(0.0001)
-                        board.digital_pin_write(onPins[o],1)
-                        board.digital_pin_write(rclckPin,0)
-                    counter2 = time.time()-start2
-        
-        counter = time.time() - start
\ No newline at end of file
+scrollTime = 0.2
+refreshTime = 0.002
+frameCacheSize = 64
+
+# Segment patterns as byte values, built once. Lowercase letters share the uppercase glyph.
+glyphTable = {char: int(bits,2) for char, bits in lookupDictionary.items()}
+glyphTable.update({char.lower(): value for char, value in glyphTable.items() if char.isalpha()})
+blankGlyph = bytes([glyphTable[' ']])
+
+def write_sevseg(msg,duration,board,onPins=onPins,serialPin=serialPinSevseg,rclckPin=rclckPinSevseg,srclckPin=srclckPinSevseg):
+    """
+    Function that shows a message on the seven segment display.
+    Returns once the message has been shown for the duration, waiting on a timer rather than spinning.
+
+
+    Args:
+        msg: Message on what wants to be written
+        duration (Integer): How long you want the message to last
+        board: The Arduino
+        onPins (List): Pins to turn on/off the digits of the seven segment display
+        serialPin (Integer): Digital pin number for the shift register's serial pin.
+        rclckPin (Integer): Digital pin number for the shift register's register clock pin.
+        srclckPin (Integer): Digital pin number for the shift register's serial clock pin..
+    """
+    display = SevsegDisplay(board,onPins=onPins,serialPin=serialPin,rclckPin=rclckPin,srclckPin=srclckPin)
+    display.set_message(msg)
+    # A scrolling message is shown the whole way through at least once
+    frames = message_frames(str(msg))
+    if len(frames)>1:
+        duration = max(duration,scrollTime*len(frames))
+    if duration<=0:
+        display.refresh_once()
+    else:
+        # The display refreshes itself in the background while this waits on a timer
+        display.start()
+        timers.Countdown(duration).wait()
+    display.stop()
+
+
+@functools.lru_cache(maxsize=frameCacheSize)
+def message_frames(msg):
+    """
+    Function that encodes a message into the 4-digit frames shown on the display.
+    Messages longer than 4 characters give one frame per scroll position.
+    Results are cached, so showing the same message again is a single lookup.
+
+    Args:
+        msg (String): Message on what wants to be written
+
+    Returns:
+        frames (Tuple): Tuple of frames, each 4 bytes of segment patterns
+    """
+    values = bytes(glyphTable[char] for char in str(msg))
+    if len(values) <= 4:
+        return (values.ljust(4,blankGlyph),)
+    return tuple(values[l:l+4].ljust(4,blankGlyph) for l in range(len(values)))
+
+
+class SevsegDisplay:
+    """
+    Class that keeps the seven segment display multiplexed from a background thread,
+    so the rest of the system never has to wait on the display.
+
+    Args:
+        board: The Arduino
+        refreshTime (Float): How long each digit is lit for in seconds
+        scrollTime (Float): How long each frame of a scrolling message is shown for in seconds
+        onPins (List): Pins to turn on/off the digits of the seven segment display
+        serialPin (Integer): Digital pin number for the shift register's serial pin.
+        rclckPin (Integer): Digital pin number for the shift register's register clock pin.
+        srclckPin (Integer): Digital pin number for the shift register's serial clock pin.
+        timer (StageTimer): Where the refresh times are recorded
+    """
+    def __init__(self,board,refreshTime=refreshTime,scrollTime=scrollTime,onPins=onPins,serialPin=serialPinSevseg,rclckPin=rclckPinSevseg,srclckPin=srclckPinSevseg,timer=timer):
+        self.board = board
+        self.timer = timer
+        self.refreshTime = refreshTime
+        self.scrollTime = scrollTime
+        self.onPins = onPins
+        self.serialPin = serialPin
+        self.rclckPin = rclckPin
+        self.srclckPin = srclckPin
+        self.message = None
+        self._shown = (message_frames('    '),time.monotonic())
+        self._stop = threading.Event()
+        self._thread = None
+
+    def set_message(self,msg):
+        """
+        Function that changes the message on the display. Returns straight away,
+        the refresh thread picks the new message up on its next frame.
+
+        Args:
+            msg: Message on what wants to be written
+        """
+        msg = str(msg)
+        if msg != self.message:
+            self.message = msg
+            # Swapping a single tuple keeps the refresh thread from ever seeing half a message
+            self._shown = (message_frames(msg),time.monotonic())
+
+    def refresh_once(self):
+        """
+        Function that lights each of the 4 digits once with the current frame.
+        """
+        start = time.perf_counter()
+        frames, shownSince = self._shown
+        frame = frames[int((time.monotonic()-shownSince)/self.scrollTime) % len(frames)]
+        for i in range(4):
+            shreg.shift_out(frame[i],self.board,self.serialPin,self.rclckPin,self.srclckPin,width=8)
+            shreg.digital_write(self.onPins[i],0,self.board)
+            self._stop.wait(self.refreshTime)
+            shreg.digital_write(self.onPins[i],1,self.board)
+        self.timer.record('display',time.perf_counter()-start)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.refresh_once()
+
+    def start(self):
+        """
+        Function that starts refreshing the display in the background.
+        """
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run,daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """
+        Function that stops refreshing the display and blanks it.
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        shreg.shift_out(0,self.board,self.serialPin,self.rclckPin,self.srclckPin,width=8)
+        self.message = None
+        self._shown = (message_frames('    '),time.monotonic())
@@ -0,0 +1,160 @@
+"""
+Shift Register driver file
+Created by: Team D09
+Version: 1
+Last modified: 18/10/2026
+"""
+
+import weakref
+import threading
+serialPinOutputs = 6
+rclckPinOutputs = 5
+srclckPinOutputs = 4
+patternWidth = 16
+digitalMessage = 0x90
+
+# Using 2 shift registers
+# For normal outputs 3 Red 3 Green 3 Blue convention
+ledDict = {
+    'cold1TooHot': '0111100000000001',
+    'cold1Hot': '0101100000000001',
+    'cold1NotVeryHot': '0100100000000001',
+    'cold2TooHot': '1111100000000011',
+    'cold2Hot': '1101100000000011',
+    'cold2NotVeryHot': '1100100000000011',
+    'heat1TooCold': '0100000011101000',
+    'heat1Cold': '0100000001101000',
+    'heat1NotVeryCold': '0100000000101000',
+    'heat2TooCold': '1100000011111000',
+    'heat2Cold': '1100000001111000',
+    'heat2NotVeryCold': '1100000000111000',
+    'neutral3': '0000011100000000',
+    'neutral2': '0000001100000000',
+    'neutral1': '0000000100000000',
+    'change': '0000000000010000',
+    'reset': '0000000000000000'
+}
+
+# Pin states, latched patterns and write locks remembered per board.
+# These are what the board is known to be holding, so writes that wouldn't change anything are dropped.
+# Forgotten once a board is gone, so a new board never inherits them.
+portStates = weakref.WeakKeyDictionary()
+latchedPatterns = weakref.WeakKeyDictionary()
+boardLocks = weakref.WeakKeyDictionary()
+
+
+def encode_pattern(bits):
+    """
+    Function that turns a string of '0'/'1' characters into an integer bitmask.
+    The first character ends up as the most significant bit, which is the first bit shifted out.
+
+    Args:
+        bits (String): The pattern as written in ledDict
+
+    Returns:
+        pattern (Integer): The pattern as a bitmask
+    """
+    return int(bits, 2)
+
+
+ledPatterns = {name: encode_pattern(bits) for name, bits in ledDict.items()}
+
+
+def _port_frame(board, pin, value):
+    """
+    Function that updates the remembered state of a pin's port and builds the Firmata
+    digital message for the whole port.
+
+    Args:
+        board: The Arduino
+        pin (Integer): Digital pin number
+        value (Integer): 1 or 0
+
+    Returns:
+        frame (Tuple): The 3 bytes of the port-wide digital message, None if the port already holds it
+    """
+    ports = portStates.setdefault(board, {})
+    port = pin // 8
+    mask = 1 << (pin % 8)
+    old = ports.get(port)
+    new = (old or 0) | mask if value else (old or 0) & ~mask
+    # A port is always written the first time, since what the board holds isn't known yet
+    if new == old:
+        return None
+    ports[port] = new
+    return (digitalMessage + port, new & 0x7f, (new >> 7) & 0x7f)
+
+
+def _send_frames(board, writes):
+    """
+    Function that sends a list of pin writes to the board as a single transaction.
+    Writes that leave a pin where it already is are dropped, e.g. the serial pin between
+    two bits with the same value. Boards without a raw command channel get one
+    digital_pin_write per changed pin instead. Writes from different threads
+    (e.g. the display refresh) never interleave.
+
+    Args:
+        board: The Arduino
+        writes (List): List of (pin, value) pairs in the order they should happen
+    """
+    with boardLocks.setdefault(board, threading.Lock()):
+        if hasattr(board, '_send_command'):
+            message = []
+            for pin, value in writes:
+                frame = _port_frame(board, pin, value)
+                if frame is not None:
+                    message.extend(frame)
+            if message:
+                board._send_command(message)
+        else:
+            for pin, value in writes:
+                if _port_frame(board, pin, value) is not None:
+                    board.digital_pin_write(pin, value)
+
+
+def digital_write(pin, value, board):
+    """
+    Function that writes a single pin through the driver. Pins sharing a port with the
+    shift register pins (like the alert pin) should be written with this so the port
+    state sent with every pattern stays correct. Nothing is sent if the pin is already at the value.
+
+    Args:
+        pin (Integer): Digital pin number
+        value (Integer): 1 or 0
+        board: The Arduino
+    """
+    _send_frames(board, [(pin, value)])
+
+
+def shift_out(pattern, board, serialPin=serialPinOutputs, rclckPin=rclckPinOutputs, srclckPin=srclckPinOutputs, width=patternWidth):
+    """
+    Function that shifts a whole pattern into the shift registers and latches it.
+    Nothing is sent if the registers are already holding the same pattern.
+
+    Args:
+        pattern: Name of a pattern in ledDict or the pattern as an integer bitmask
+        board: The Arduino
+        serialPin (Integer): Digital pin number for the shift register's serial pin.
+        rclckPin (Integer): Digital pin number for the shift register's register clock pin.
+        srclckPin (Integer): Digital pin number for the shift register's serial clock pin.
+        width (Integer): Number of bits in the pattern
+
+    Returns:
+        Boolean: True if the pattern was sent, False if it was already latched
+    """
+    if isinstance(pattern, str):
+        pattern = ledPatterns[pattern]
+    latched = latchedPatterns.setdefault(board, {})
+    if latched.get(serialPin) == pattern:
+        return False
+
+    writes = []
+    for bit in range(width-1, -1, -1):
+        writes.append((serialPin, (pattern >> bit) & 1))
+        writes.append((srclckPin, 1))
+        writes.append((srclckPin, 0))
+    writes.append((rclckPin, 1))
+    writes.append((rclckPin, 0))
+    _send_frames(board, writes)
+    latched[serialPin] = pattern
+    return True
@@ -0,0 +1,241 @@
+"""
+Simulated Board file
+Created by: Team D09
+Version: 1
+Last modified: 18/10/2026
+"""
+
+import math
+import time
+import threading
+import calibration as cal
+baudRate = 115200
+messageLatency = 0.0001
+samplingInterval = 0.019
+setDigitalPinValue = 0xF5
+digitalMessage = 0x90
+
+
+def constant(value):
+    """
+    Function that makes a waveform that never changes.
+
+    Args:
+        value (Float): The value
+
+    Returns:
+        waveform (Function): Takes the time in seconds and gives the value
+    """
+    return lambda t: value
+
+
+def sine(mean,amplitude,period):
+    """
+    Function that makes a sine waveform.
+
+    Args:
+        mean (Float): The middle value
+        amplitude (Float): How far it swings either side of the mean
+        period (Float): Seconds per cycle
+
+    Returns:
+        waveform (Function): Takes the time in seconds and gives the value
+    """
+    return lambda t: mean + amplitude*math.sin(2*math.pi*t/period)
+
+
+def ramp(start,rate,low=-math.inf,high=math.inf):
+    """
+    Function that makes a waveform that changes at a steady rate, clipped to a range.
+
+    Args:
+        start (Float): The value at time 0
+        rate (Float): Change per second
+        low (Float): Smallest value
+        high (Float): Largest value
+
+    Returns:
+        waveform (Function): Takes the time in seconds and gives the value
+    """
+    return lambda t: min(max(start + rate*t,low),high)
+
+
+def steps(points):
+    """
+    Function that makes a waveform that jumps between values at set times.
+
+    Args:
+        points (List): (time, value) pairs in time order. The first value holds until the second time.
+
+    Returns:
+        waveform (Function): Takes the time in seconds and gives the value
+    """
+    def waveform(t):
+        value = points[0][1]
+        for start, pointValue in points:
+            if t >= start:
+                value = pointValue
+        return value
+    return waveform
+
+
+def raw_from_value(value,coefficients):
+    """
+    Function that works out the 10-bit reading a sensor would give for a value,
+    inverting the calibration curve a*exp(b*R) and the voltage divider.
+
+    Args:
+        value (Float): Temperature or lux
+        coefficients (Tuple): (a, b) of the calibration curve
+
+    Returns:
+        raw (Integer): The reading, between 1 and 1022
+    """
+    a, b = coefficients
+    if value <= 0:
+        return 1022 if b < 0 else 1
+    resistance = max(math.log(value/a)/b,0)
+    voltOut = resistance/(2+resistance/5)
+    return min(max(round(voltOut*1023/5),1),1022)
+
+
+class SimulatedBoard:
+    """
+    Class that stands in for pymata4.Pymata4 so the system can run, be tested and be
+    benchmarked without an Arduino. Sensor readings come from scriptable waveforms. Every
+    Firmata message sent is counted, and every write to the serial port is counted and charged a serial cost.
+
+    Args:
+        temperature (Function): Waveform of the room temperature in degrees C against time in seconds
+        light (Function): Waveform of the light intensity in lux against time in seconds
+        baudRate (Integer): Serial speed used to cost each byte
+        messageLatency (Float): Fixed cost of each write to the serial port in seconds
+        realtime (Boolean): Sleep for the cost of each message. Otherwise the cost is only added to clock.
+        thermIn (Integer): Analog pin number for the thermistor
+        lightIn (Integer): Analog pin number for the LDR
+    """
+    def __init__(self,temperature=constant(19),light=constant(500),baudRate=baudRate,messageLatency=messageLatency,realtime=False,thermIn=0,lightIn=1):
+        self.waveforms = {thermIn: (temperature,cal.tempCoefficients),lightIn: (light,cal.lightCoefficients)}
+        self.byteTime = 10/baudRate
+        self.messageLatency = messageLatency
+        self.realtime = realtime
+        self.pinModes = {}
+        self.pinValues = {}
+        self.analogValues = {}
+        self.analogTimes = {}
+        self.callbacks = {}
+        self.differentials = {}
+        self.messages = 0
+        self.writes = 0
+        self.bytesSent = 0
+        self.clock = 0.0
+        self.samplingInterval = samplingInterval
+        self._start = time.monotonic()
+        self._lock = threading.Lock()
+        self._reporter = None
+        self._stop = threading.Event()
+
+    def now(self):
+        """
+        Function that gives the board's time, which drives the waveforms.
+
+        Returns:
+            seconds (Float): Seconds since the board was made
+        """
+        if self.realtime:
+            return time.monotonic() - self._start
+        return self.clock
+
+    def reset_counters(self):
+        """
+        Function that sets the message, write and byte counters back to zero.
+        """
+        with self._lock:
+            self.messages = 0
+            self.writes = 0
+            self.bytesSent = 0
+
+    def _charge(self,size,messages=1):
+        cost = self.messageLatency + size*self.byteTime
+        with self._lock:
+            self.messages += messages
+            self.writes += 1
+            self.bytesSent += size
+            self.clock += cost
+        if self.realtime:
+            time.sleep(cost)
+
+    def _send_command(self,command):
+        data = bytes(command)
+        # A batched write is still one Firmata message per 3-byte frame
+        self._charge(len(data),max(len(data)//3,1))
+        # Keep track of what port-wide digital messages did to each pin
+        for i in range(0,len(data)-2,3):
+            if data[i] & 0xF0 == digitalMessage:
+                port = data[i] & 0x0F
+                value = data[i+1] | (data[i+2] << 7)
+                for bit in range(8):
+                    pin = port*8 + bit
+                    if self.pinModes.get(pin) == 'output':
+                        self.pinValues[pin] = (value >> bit) & 1
+        return len(data)
+
+    def set_pin_mode_digital_output(self,pin):
+        self.pinModes[pin] = 'output'
+        self.pinValues[pin] = 0
+        self._charge(3)
+
+    def set_pin_mode_analog_input(self,pin,callback=None,differential=1):
+        self.pinModes[pin] = 'analog'
+        self.callbacks[pin] = callback
+        self.differentials[pin] = differential
+        self.analogValues[pin] = 0
+        self.analogTimes[pin] = 0
+        self._charge(5)
+        if callback is not None and self._reporter is None:
+            self._reporter = threading.Thread(target=self._report_loop,daemon=True)
+            self._reporter.start()
+
+    def set_sampling_interval(self,interval):
+        self.samplingInterval = interval/1000
+        self._charge(5)
+
+    def digital_pin_write(self,pin,value):
+        self.pinValues[pin] = value
+        self._charge(3)
+
+    def digital_write(self,pin,value):
+        self.pinValues[pin] = value
+        self._charge(3)
+
+    def report_analog(self):
+        """
+        Function that samples every analog pin once, the way Firmata does each sampling
+        interval, calling the pin's callback if the reading moved by at least its differential.
+        """
+        timeStamp = time.time()
+        for pin in list(self.callbacks):
+            waveform, coefficients = self.waveforms.get(pin,(constant(0),cal.tempCoefficients))
+            raw = raw_from_value(waveform(self.now()),coefficients)
+            if abs(raw-self.analogValues[pin]) >= self.differentials[pin]:
+                self.analogValues[pin] = raw
+                self.analogTimes[pin] = timeStamp
+                if self.callbacks[pin] is not None:
+                    self.callbacks[pin]([2,pin,raw,timeStamp])
+
+    def _report_loop(self):
+        while not self._stop.wait(self.samplingInterval):
+            if not self.realtime:
+                with self._lock:
+                    self.clock += self.samplingInterval
+            self.report_analog()
+
+    def analog_read(self,pin):
+        if self.callbacks.get(pin) is None and pin in self.waveforms:
+            waveform, coefficients = self.waveforms[pin]
+            self.analogValues[pin] = raw_from_value(waveform(self.now()),coefficients)
+            self.analogTimes[pin] = time.time()
+        return self.analogValues.get(pin,0), self.analogTimes.get(pin,0)
+
+    def shutdown(self):
+        self._stop.set()
@@ -5,7 +5,8 @@ Version: 1
 Last modified: 11/09/2023
 """
 
-import time
+import timers
+lockoutTime = 120
 
 def set_pin():
     """
@@ -27,7 +28,8 @@ def set_pin():
 
 def check_pin(pin):
     """
-    Function that asks the user and checks the pin. Failure results in a 2 minute timeout.
+    Function that asks the user and checks the pin. Failure results in a 2 minute timeout,
+    which waits without using the CPU.
     
     Parameter:
         pin (Integer): Variable containing pin
@@ -51,17 +53,13 @@ def check_pin(pin):
             i+=1
             if i == 3:
                 print("You're locked out for some time")
-                counter = 0
-                startCount = time.time()
+                lockout = timers.Countdown(lockoutTime)
                 while True:
                     try:
-                        if counter<120:
-                            endCount = time.time()
-                            counter = endCount - startCount
-                        else:
-                            break
+                        lockout.wait()
+                        break
                     except KeyboardInterrupt:
-                        print(f"Still in lockout mode for {120-counter} more seconds")
+                        print(f"Still in lockout mode for {round(lockout.remaining())} more seconds")
                 break
             else:
                 print(f"Wrong pin, please try again. You have {3-i} tries left")
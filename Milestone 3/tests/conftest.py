@@ -0,0 +1,12 @@
+"""
+Test configuration file
+Created by: Team D09
+Version: 1
+Last modified: 18/10/2026
+
+Lets the tests import the system's modules, which sit in the folder above.
+"""
+
+import os
+import sys
+sys.path.insert(0,os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
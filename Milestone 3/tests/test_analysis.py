@@ -0,0 +1,54 @@
+"""
+Analysis test file
+Created by: Team D09
+Version: 1
+Last modified: 18/10/2026
+"""
+
+import numpy as np
+import pytest
+import analysis
+
+
+def make_samples(samples=2000,days=21,seed=0):
+    rng = np.random.default_rng(seed)
+    times = days*86400 + np.cumsum(rng.uniform(0.2,1.0,samples))
+    temps = 19 + 0.01*(times-times[0]) + rng.normal(0,0.05,samples)
+    return times, temps
+
+
+@pytest.mark.parametrize('window',[2,5,analysis.slopeWindow])
+def test_gradient_tracker_matches_window_slope(window):
+    # Weeks of timestamps is where the running sums used to lose precision
+    times, temps = make_samples()
+    tracker = analysis.GradientTracker(window)
+    for end, (timeStamp, temp) in enumerate(zip(times,temps),1):
+        tracker.add(timeStamp,temp)
+        start = max(end-window,0)
+        assert tracker.slope == pytest.approx(analysis.window_slope(times[start:end],temps[start:end]),abs=1e-9)
+
+
+def test_rolling_slopes_match_window_slope():
+    times, temps = make_samples()
+    window = analysis.slopeWindow
+    expected = [analysis.window_slope(times[max(end-window,0):end],temps[max(end-window,0):end]) for end in range(1,len(times)+1)]
+    np.testing.assert_allclose(analysis.rolling_slopes(times,temps,window,chunkSize=300),expected,atol=1e-9)
+
+
+def test_smoothed_slopes_match_gradient_tracker():
+    times, temps = make_samples()
+    tracker = analysis.GradientTracker()
+    expected = [tracker.add(timeStamp,temp) for timeStamp, temp in zip(times,temps)]
+    np.testing.assert_allclose(analysis.smoothed_slopes(times,temps),expected,atol=1e-9)
+
+
+def test_gradient_tracker_events():
+    tracker = analysis.GradientTracker(window=5,smoothing=1,threshold=0.5)
+    for second in range(10):
+        tracker.add(second,20+second)
+    assert tracker.pop_event() == 'rise'
+    assert tracker.pop_event() is None
+    for second in range(10,20):
+        tracker.add(second,30)
+    assert tracker.trend is None
+    assert tracker.pop_event() is None
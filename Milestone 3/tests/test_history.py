@@ -0,0 +1,78 @@
+"""
+Sensor History test file
+Created by: Team D09
+Version: 1
+Last modified: 18/10/2026
+"""
+
+import numpy as np
+import pytest
+import history as hist
+
+
+def make_samples(samples=3000,start=1.8e9,seed=0):
+    """
+    Function that makes samples at uneven times, with a few gaps longer than a bucket.
+
+    Returns:
+        times (numpy.ndarray): When each sample was taken in seconds
+        values (numpy.ndarray): One row per sample of its temperature, gradient and light
+    """
+    rng = np.random.default_rng(seed)
+    steps = rng.uniform(0.1,2.0,samples)
+    steps[rng.integers(0,samples,20)] += 90
+    times = start + np.cumsum(steps)
+    values = np.column_stack((rng.normal(20,2,samples),rng.normal(0,0.1,samples),rng.uniform(0,1500,samples)))
+    return times, values
+
+
+def assert_same(rollup,expected):
+    assert len(rollup) == len(expected)
+    assert rollup.count == expected.count
+    np.testing.assert_allclose(rollup.view('time'),expected.view('time'))
+    for column in hist.columns[1:]:
+        for stat in hist.stats:
+            np.testing.assert_allclose(rollup.view(column,stat),expected.view(column,stat),rtol=1e-12)
+
+
+@pytest.mark.parametrize('resolution,capacity',[(1,5000),(60,50),(3600,3)])
+@pytest.mark.parametrize('chunks',[1,7])
+def test_extend_matches_add(resolution,capacity,chunks):
+    times, values = make_samples()
+    added = hist.Rollup(resolution,capacity)
+    for timeStamp, row in zip(times,values):
+        added.add(timeStamp,tuple(row))
+    extended = hist.Rollup(resolution,capacity)
+    # Splitting the samples up also checks samples joining the bucket that's still open
+    for part in np.array_split(np.arange(len(times)),chunks):
+        extended.extend(times[part],values[part])
+    assert_same(extended,added)
+
+
+def test_extend_then_add_carries_on_the_bucket():
+    times, values = make_samples(500)
+    added = hist.Rollup(60,100)
+    for timeStamp, row in zip(times,values):
+        added.add(timeStamp,tuple(row))
+    mixed = hist.Rollup(60,100)
+    mixed.extend(times[:250],values[:250])
+    for timeStamp, row in zip(times[250:],values[250:]):
+        mixed.add(timeStamp,tuple(row))
+    assert_same(mixed,added)
+
+
+def test_extend_with_nothing():
+    rollup = hist.Rollup(60,10)
+    rollup.extend([],np.empty((0,3)))
+    assert len(rollup) == 0
+
+
+def test_saved_state_carries_on():
+    times, values = make_samples(800)
+    rollup = hist.Rollup(60,40)
+    rollup.extend(times[:400],values[:400])
+    restored = hist.Rollup(60,40)
+    restored.load_state(rollup.state())
+    rollup.extend(times[400:],values[400:])
+    restored.extend(times[400:],values[400:])
+    assert_same(restored,rollup)
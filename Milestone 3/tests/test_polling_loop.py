@@ -0,0 +1,49 @@
+"""
+Polling Loop test file
+Created by: Team D09
+Version: 1
+Last modified: 18/10/2026
+"""
+
+import records as rec
+import Polling_Loop as ploop
+settings = rec.Settings(tempLow=18,tempHigh=20,ventSpeed=1)
+
+
+def test_every_state_has_an_output():
+    for temp in range(0,40):
+        for light in (0,2000):
+            assert ploop.output_state(temp+0.25,light,settings) in ploop.outputFrames
+
+
+def test_temperature_hysteresis():
+    inside = ploop.output_state(19.8,500,settings)
+    assert inside[0] == 'neutral'
+    # Just past the boundary isn't enough to leave the state it's in
+    assert ploop.output_state(20.3,500,settings,inside) == inside
+    hot = ploop.output_state(20.6,500,settings,inside)
+    assert hot[0] == 'cool'
+    assert hot == ploop.output_state(20.6,500,settings)
+    # Or to come back
+    assert ploop.output_state(19.8,500,settings,hot) == hot
+    assert ploop.output_state(19.4,500,settings,hot)[0] == 'neutral'
+
+
+def test_light_hysteresis():
+    low = ploop.output_state(19,900,settings)
+    assert low[1] == 1
+    assert ploop.output_state(19,1040,settings,low)[1] == 1
+    high = ploop.output_state(19,1060,settings,low)
+    assert high[1] == 2
+    assert ploop.output_state(19,960,settings,high)[1] == 2
+    assert ploop.output_state(19,940,settings,high)[1] == 1
+
+
+def test_no_previous_state_has_no_hysteresis():
+    assert ploop.output_state(20.3,1040,settings)[0] == 'cool'
+    assert ploop.output_state(20.3,1040,settings)[1] == 2
+
+
+def test_jumping_far_past_a_boundary_changes_straight_away():
+    inside = ploop.output_state(19,500,settings)
+    assert ploop.output_state(35,500,settings,inside) == ('cool',1,'tooHot')
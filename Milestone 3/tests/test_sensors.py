@@ -0,0 +1,50 @@
+"""
+Analog Sensor test file
+Created by: Team D09
+Version: 1
+Last modified: 18/10/2026
+"""
+
+import pytest
+import sensors as sens
+
+
+def run(sampleFilter,readings):
+    return [sampleFilter.add(raw) for raw in readings]
+
+
+def test_filter_turned_off_passes_readings_through():
+    assert run(sens.SampleFilter(1,1,1),[5,700,3]) == [5,700,3]
+
+
+def test_oversampling_averages_groups():
+    assert run(sens.SampleFilter(4,1,1),[1,2,3,4,10,10,10,14]) == [None,None,None,2.5,None,None,None,11]
+
+
+def test_median_throws_out_a_spike():
+    outputs = run(sens.SampleFilter(1,3,1),[500,500,500,1023,500,500,0,500])
+    assert outputs == [500,500,500,500,500,500,500,500]
+
+
+def test_median_of_an_even_window():
+    assert run(sens.SampleFilter(1,4,1),[1,3]) == [1,2]
+
+
+def test_moving_average_smooths():
+    outputs = run(sens.SampleFilter(1,1,0.5),[0,8,8,8])
+    assert outputs == [0,4,6,7]
+
+
+def test_filter_matches_doing_it_by_hand():
+    readings = [(17*i) % 97 for i in range(400)]
+    oversampling, medianSize, smoothing = 4, 3, 0.3
+    averages = [sum(readings[i:i+oversampling])/oversampling for i in range(0,len(readings),oversampling)]
+    expected = []
+    value = None
+    for i in range(len(averages)):
+        window = sorted(averages[max(i-medianSize+1,0):i+1])
+        median = (window[(len(window)-1)//2] + window[len(window)//2])/2
+        value = median if value is None else value + smoothing*(median-value)
+        expected.append(value)
+    outputs = [output for output in run(sens.SampleFilter(oversampling,medianSize,smoothing),readings) if output is not None]
+    assert outputs == pytest.approx(expected)
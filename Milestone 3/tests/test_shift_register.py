@@ -0,0 +1,111 @@
+"""
+Shift Register test file
+Created by: Team D09
+Version: 1
+Last modified: 18/10/2026
+"""
+
+import pytest
+import simulated_board as simb
+import shift_register as shreg
+digitalPins = [3,4,5,6,7,8,9,10,11,12,13,16,17]
+
+
+class RecordingBoard(simb.SimulatedBoard):
+    """
+    Class that is a simulated board which also keeps every raw command sent to it.
+    """
+    def __init__(self,*args,**kwargs):
+        super().__init__(*args,**kwargs)
+        self.commands = []
+
+    def _send_command(self,command):
+        self.commands.append(bytes(command))
+        return super()._send_command(command)
+
+
+@pytest.fixture
+def board():
+    board = RecordingBoard()
+    for pin in digitalPins:
+        board.set_pin_mode_digital_output(pin)
+    board.reset_counters()
+    yield board
+    board.shutdown()
+
+
+def latched_pattern(commands,serialPin=shreg.serialPinOutputs,rclckPin=shreg.rclckPinOutputs,srclckPin=shreg.srclckPinOutputs,width=shreg.patternWidth):
+    """
+    Function that plays the port frames sent to the board into a model of the shift registers.
+
+    Args:
+        commands (List): Raw commands sent to the board
+        serialPin (Integer): Digital pin number for the shift register's serial pin.
+        rclckPin (Integer): Digital pin number for the shift register's register clock pin.
+        srclckPin (Integer): Digital pin number for the shift register's serial clock pin.
+        width (Integer): Number of bits the registers hold
+
+    Returns:
+        pattern (Integer): What the registers latched last, None if they never latched
+    """
+    ports = {}
+    shifted = 0
+    latched = None
+
+    def level(pin):
+        return (ports.get(pin//8,0) >> (pin%8)) & 1
+
+    for data in commands:
+        assert len(data) % 3 == 0
+        for i in range(0,len(data),3):
+            assert data[i] & 0xF0 == shreg.digitalMessage
+            before = (level(srclckPin),level(rclckPin))
+            ports[data[i] & 0x0F] = data[i+1] | (data[i+2] << 7)
+            if level(srclckPin) and not before[0]:
+                shifted = ((shifted << 1) | level(serialPin)) & ((1 << width)-1)
+            if level(rclckPin) and not before[1]:
+                latched = shifted
+    return latched
+
+
+@pytest.mark.parametrize('name',['heat2Cold','neutral1','cold1TooHot','reset'])
+def test_shift_out_latches_the_pattern(board,name):
+    assert shreg.shift_out('heat1Cold',board)
+    assert shreg.shift_out(name,board) == (name != 'heat1Cold')
+    assert latched_pattern(board.commands) == shreg.ledPatterns[name]
+
+
+def test_shift_out_sends_one_write(board):
+    shreg.shift_out('heat2Cold',board)
+    assert board.writes == 1
+    # Every frame changes a pin, so no frame repeats what the port already holds
+    assert board.messages == len(board.commands[0])//3
+    ports = {}
+    for i in range(0,len(board.commands[0]),3):
+        frame = board.commands[0][i:i+3]
+        assert ports.get(frame[0]) != frame[1:]
+        ports[frame[0]] = frame[1:]
+
+
+def test_shift_out_skips_a_latched_pattern(board):
+    shreg.shift_out('heat2Cold',board)
+    board.reset_counters()
+    assert not shreg.shift_out('heat2Cold',board)
+    assert not shreg.shift_out(shreg.ledPatterns['heat2Cold'],board)
+    assert board.messages == 0 and board.writes == 0
+
+
+def test_digital_write_skips_unchanged_pins(board):
+    shreg.digital_write(3,1,board)
+    board.reset_counters()
+    shreg.digital_write(3,1,board)
+    assert board.messages == 0
+    shreg.digital_write(3,0,board)
+    assert board.messages == 1 and board.pinValues[3] == 0
+
+
+def test_pin_writes_keep_the_rest_of_the_port(board):
+    shreg.digital_write(3,1,board)
+    shreg.shift_out('heat2Cold',board)
+    # The alert pin shares a port with the shift register pins, so shifting must not clear it
+    assert board.pinValues[3] == 1
@@ -0,0 +1,113 @@
+"""
+Timer function file
+Created by: Team D09
+Version: 1
+Last modified: 18/10/2026
+"""
+
+import sched
+import time
+import threading
+
+
+class Scheduler:
+    """
+    Class that runs functions after a delay from one background thread. The thread sleeps on an
+    event until the next function is due, so waiting takes no CPU, and adding a function that's
+    due sooner wakes it straight away.
+    """
+    def __init__(self):
+        self._wake = threading.Event()
+        self._queue = sched.scheduler(time.monotonic,self._delay)
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def _delay(self,seconds):
+        self._wake.wait(seconds)
+        self._wake.clear()
+
+    def _run(self):
+        while True:
+            self._queue.run()
+            self._wake.wait()
+            self._wake.clear()
+
+    def call_later(self,delay,func,*args):
+        """
+        Function that runs a function on the scheduler's thread after a delay.
+
+        Args:
+            delay (Float): Seconds to wait
+            func (Function): The function, which should return quickly
+            *args: Arguments to give the function
+
+        Returns:
+            entry: Pass to cancel to stop the function from running
+        """
+        entry = self._queue.enter(delay,0,func,args)
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run,daemon=True)
+                self._thread.start()
+        self._wake.set()
+        return entry
+
+    def cancel(self,entry):
+        """
+        Function that stops a function from running, if it hasn't already.
+
+        Args:
+            entry: From call_later
+        """
+        try:
+            self._queue.cancel(entry)
+        except ValueError:
+            pass
+
+
+class Countdown:
+    """
+    Class that counts down a length of time on a scheduler. Anything can wait for it
+    without using the CPU, and it can be checked or cancelled at any point.
+
+    Args:
+        seconds (Float): How long to count down
+        scheduler (Scheduler): Scheduler to count down on. Defaults to the shared one.
+    """
+    def __init__(self,seconds,scheduler=None):
+        self.scheduler = scheduler if scheduler is not None else shared
+        self.deadline = time.monotonic() + seconds
+        self.finished = threading.Event()
+        self._entry = self.scheduler.call_later(max(seconds,0),self.finished.set)
+
+    def remaining(self):
+        """
+        Function that gives how long is left.
+
+        Returns:
+            seconds (Float): Seconds left, 0 once finished
+        """
+        return 0.0 if self.finished.is_set() else max(self.deadline-time.monotonic(),0.0)
+
+    def wait(self,timeout=None):
+        """
+        Function that waits for the countdown to finish. Ctrl + C still works while waiting.
+
+        Args:
+            timeout (Float): Longest time to wait in seconds. Defaults to waiting until it's finished.
+
+        Returns:
+            Boolean: True if the countdown has finished
+        """
+        return self.finished.wait(timeout)
+
+    def cancel(self):
+        """
+        Function that finishes the countdown early.
+        """
+        self.scheduler.cancel(self._entry)
+        self.finished.set()
+
+
+# Shared by everything that has to wait, so they all use the one thread
+shared = Scheduler()
@@ -0,0 +1,173 @@
+"""
+Multi-Zone Controller file
+Created by: Team D09
+Version: 1
+Last modified: 18/10/2026
+
+Controls several rooms from one process, each with its own Arduino.
+    python zones.py --port COM3 --port COM4    one zone per Arduino
+    python zones.py --simulate 3               three simulated zones
+"""
+
+import sys
+import argparse
+import threading
+import traceback
+from dataclasses import dataclass, field
+import sevseg
+import records as rec
+import simulated_board as simb
+import board_setup as bset
+import Polling_Loop as ploop
+from instrumentation import StageTimer
+
+
+@dataclass(slots=True)
+class PinMap:
+    """
+    Record of which pin everything in a zone is wired to. Defaults to the wiring of a single room.
+
+    Args:
+        thermIn (Integer): Analog pin number for the thermistor
+        lightIn (Integer): Analog pin number for the LDR
+        serialPin (Integer): Digital pin number for the LED shift register's serial pin
+        rclckPin (Integer): Digital pin number for the LED shift register's register clock pin
+        srclckPin (Integer): Digital pin number for the LED shift register's serial clock pin
+        alertPin (Integer): Digital pin number for if there's a rapid change in temperature
+        risePin (Integer): Digital pin number for the output when the temperature rises quickly
+        fallPin (Integer): Digital pin number for the output when the temperature falls quickly
+        sevsegSerialPin (Integer): Digital pin number for the display shift register's serial pin
+        sevsegRclckPin (Integer): Digital pin number for the display shift register's register clock pin
+        sevsegSrclckPin (Integer): Digital pin number for the display shift register's serial clock pin
+        onPins (List): Pins to turn on/off the digits of the seven segment display
+    """
+    thermIn: int = ploop.thermIn
+    lightIn: int = ploop.lightIn
+    serialPin: int = ploop.serialPinOutputs
+    rclckPin: int = ploop.rclckPinOutputs
+    srclckPin: int = ploop.srclckPinOutputs
+    alertPin: int = ploop.alertPin
+    risePin: int = ploop.risePin
+    fallPin: int = ploop.fallPin
+    sevsegSerialPin: int = sevseg.serialPinSevseg
+    sevsegRclckPin: int = sevseg.rclckPinSevseg
+    sevsegSrclckPin: int = sevseg.srclckPinSevseg
+    onPins: list = field(default_factory=lambda: list(sevseg.onPins))
+
+    def digital_pins(self):
+        """
+        Function that gives every digital output pin in the map.
+
+        Returns:
+            pins (List): Digital pin numbers
+        """
+        return [self.serialPin,self.rclckPin,self.srclckPin,self.alertPin,self.risePin,self.fallPin,
+                self.sevsegSerialPin,self.sevsegRclckPin,self.sevsegSrclckPin,*self.onPins]
+
+
+@dataclass(slots=True)
+class Zone:
+    """
+    Record of one room: its board, its wiring, its settings and its history.
+
+    Args:
+        name (String): Name of the room
+        pins (PinMap): Which pin everything is wired to
+        settings (Settings): The settings set by the user for this room
+        state (ControlState): The current temperature, the current light and the sensor history of this room
+        comPort (String): Serial port the room's Arduino is on. Defaults to the first one found.
+        board: The room's board. Connected to when the zone starts if it's None.
+        timer (StageTimer): How long each stage of this room's loop takes, kept apart from the other rooms
+        error (Exception): What stopped the room's loop, None if nothing went wrong
+    """
+    name: str
+    pins: PinMap = field(default_factory=PinMap)
+    settings: rec.Settings = field(default_factory=rec.Settings)
+    state: rec.ControlState = field(default_factory=rec.ControlState)
+    comPort: str = None
+    board: object = None
+    timer: StageTimer = field(default_factory=StageTimer)
+    error: Exception = None
+
+
+def run_zone(zone,stop):
+    """
+    Function that connects a zone's board and runs its polling loop until stop is set.
+    The loops of every zone share one terminal, so they run quietly. If the loop fails,
+    the error is shown with the zone's name and kept on the zone.
+
+    Args:
+        zone (Zone): The room
+        stop (threading.Event): Stops the loop when set
+    """
+    pins = zone.pins
+    try:
+        if zone.board is None:
+            zone.board = bset.connect(False,pins.digital_pins(),[pins.thermIn,pins.lightIn],zone.comPort,zone.timer)
+        else:
+            bset.set_up_pins(zone.board,pins.digital_pins(),[pins.thermIn,pins.lightIn],zone.timer)
+        display = sevseg.SevsegDisplay(zone.board,onPins=pins.onPins,serialPin=pins.sevsegSerialPin,rclckPin=pins.sevsegRclckPin,srclckPin=pins.sevsegSrclckPin,timer=zone.timer)
+        zone.state = ploop.polling_loop(zone.state,zone.settings,zone.board,pins.serialPin,pins.rclckPin,pins.srclckPin,
+                                        pins.risePin,pins.fallPin,pins.alertPin,pins.thermIn,pins.lightIn,display,stop,
+                                        verbose=False,timer=zone.timer)
+    except Exception as error:
+        zone.error = error
+        print(f"{zone.name} stopped: {error!r}")
+        traceback.print_exc()
+
+
+def run_zones(zones,stop=None):
+    """
+    Function that runs every zone at once, each on its own thread, so a slow board or
+    another zone being added never holds up the others. Returns once every zone has stopped.
+
+    Args:
+        zones (List): The rooms
+        stop (threading.Event): Stops every zone when set. Ctrl + C stops them too.
+
+    Returns:
+        zones (List): The rooms, with the state each finished in
+    """
+    if stop is None:
+        stop = threading.Event()
+    threads = [threading.Thread(target=run_zone,args=(zone,stop),name=zone.name,daemon=True) for zone in zones]
+    for thread in threads:
+        thread.start()
+    try:
+        for thread in threads:
+            while thread.is_alive():
+                thread.join(0.5)
+    except KeyboardInterrupt:
+        stop.set()
+        for thread in threads:
+            thread.join()
+    return zones
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Control several rooms, one Arduino each")
+    parser.add_argument('--port',action='append',default=[],help="serial port of a room's Arduino, once per room")
+    parser.add_argument('--simulate',type=int,default=0,metavar='ZONES',help="add this many simulated rooms")
+    args = parser.parse_args(argv)
+
+    zones = [Zone(f"Zone {i+1}",comPort=port) for i, port in enumerate(args.port)]
+    for i in range(args.simulate):
+        # Each simulated room drifts at its own rate so they can be told apart
+        board = simb.SimulatedBoard(temperature=simb.sine(19,4,300*(i+1)),realtime=True)
+        zones.append(Zone(f"Simulated zone {i+1}",board=board))
+    if not zones:
+        parser.error("give at least one --port or --simulate")
+    print("Ctrl + C to stop")
+    run_zones(zones)
+    for zone in zones:
+        if zone.board is not None:
+            zone.board.shutdown()
+        print(f"\n{zone.name}: {'stopped by ' + repr(zone.error) if zone.error else 'stopped'}, "
+              f"{round(zone.state.currentTemp,1)} C at the end")
+        print("Loop stage timings (ms)")
+        print(zone.timer.report())
+    return 1 if any(zone.error for zone in zones) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())